@@ -0,0 +1,317 @@
+"""Benchmarks for hashtable operations, measured against the built-in dict
+
+Run it as a script, for example::
+
+    python benchmark_hashtable.py --sizes 1000 100000 --key-types int str
+
+Every operation is timed ``--repeat`` times on fresh data and the best
+run is reported in nanoseconds per item, together with its ratio to the
+same operation on a ``dict``. Memory per entry is measured with
+``tracemalloc`` and excludes the keys and values themselves.
+"""
+
+import gc
+import random
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from time import perf_counter
+from typing import Any, Callable, Hashable, NamedTuple
+
+from hashtable import (
+    HashTable,
+    IntHashTable,
+    OpenAddressingHashTable,
+    RobinHoodHashTable,
+)
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+class Result(NamedTuple):
+    table: str
+    key_type: str
+    size: int
+    operation: str
+    measure: float
+    unit: str
+    ratio: float
+
+
+def _make_keys(key_type: str, size: int) -> list[Hashable]:
+    if key_type == "int":
+        return list(range(size))
+    if key_type == "str":
+        return [f"key-{i}" for i in range(size)]
+    if key_type == "tuple":
+        return [(i, f"{i}") for i in range(size)]
+    if key_type == "collision":
+        # a common stride lands every key in the same bucket of a table
+        # whose capacity is a power of two, unless the hash gets mixed
+        return [i << 32 for i in range(size)]
+    raise ValueError(f"unknown key type: {key_type!r}")
+
+
+def _make_dict(capacity: int) -> dict:
+    return {}
+
+
+# every factory takes the initial capacity and returns an empty mapping
+TABLES: dict[str, Callable[[int], Any]] = {
+    "dict": _make_dict,
+    "HashTable": HashTable,
+    "OpenAddressing[linear]": lambda capacity: OpenAddressingHashTable(
+        capacity, "linear"
+    ),
+    "OpenAddressing[quadratic]": lambda capacity: OpenAddressingHashTable(
+        capacity, "quadratic"
+    ),
+    "RobinHood": RobinHoodHashTable,
+    "IntHashTable": lambda capacity: IntHashTable(capacity, "q"),
+}
+
+# tables that only accept some kinds of keys
+KEY_TYPES_SUPPORTED = {"IntHashTable": {"int", "collision"}}
+
+
+def _fill(factory: Callable[[int], Any], keys: list, values: list):
+    table = factory(8)
+    for key, value in zip(keys, values):
+        table[key] = value
+    return table
+
+
+def _bench_insert(factory, keys, values, misses):
+    start = perf_counter()
+    _fill(factory, keys, values)
+    return perf_counter() - start
+
+
+def _bench_lookup_hit(factory, keys, values, misses):
+    table = _fill(factory, keys, values)
+    start = perf_counter()
+    for key in keys:
+        table[key]
+    return perf_counter() - start
+
+
+def _bench_lookup_miss(factory, keys, values, misses):
+    table = _fill(factory, keys, values)
+    start = perf_counter()
+    for key in misses:
+        key in table
+    return perf_counter() - start
+
+
+def _bench_delete(factory, keys, values, misses):
+    table = _fill(factory, keys, values)
+    start = perf_counter()
+    for key in keys:
+        del table[key]
+    return perf_counter() - start
+
+
+def _bench_iterate(factory, keys, values, misses):
+    table = _fill(factory, keys, values)
+    start = perf_counter()
+    for _ in table.values() if isinstance(table, dict) else table.values:
+        pass
+    return perf_counter() - start
+
+
+def _bench_from_dict(factory, keys, values, misses):
+    source = dict(zip(keys, values))
+    start = perf_counter()
+    # like from_dict(), but through the factory so that its configuration,
+    # such as the probing or the value type code, is kept
+    table = factory(len(source))
+    table.update(source)
+    return perf_counter() - start
+
+
+def _bench_copy(factory, keys, values, misses):
+    table = _fill(factory, keys, values)
+    start = perf_counter()
+    table.copy()
+    return perf_counter() - start
+
+
+def _bench_mixed(factory, keys, values, misses):
+    table = _fill(factory, keys, values)
+    operations = random.Random(42).choices("gsd", weights=(5, 3, 2), k=len(keys))
+    start = perf_counter()
+    for operation, key, value in zip(operations, keys, values):
+        if operation == "g":
+            table.get(key)
+        elif operation == "s":
+            table[key] = value
+        else:
+            del table[key]
+            table[key] = value
+    return perf_counter() - start
+
+
+OPERATIONS: dict[str, Callable[..., float]] = {
+    "insert": _bench_insert,
+    "lookup_hit": _bench_lookup_hit,
+    "lookup_miss": _bench_lookup_miss,
+    "delete": _bench_delete,
+    "iterate": _bench_iterate,
+    "from_dict": _bench_from_dict,
+    "copy": _bench_copy,
+    "mixed": _bench_mixed,
+}
+
+
+def time_operation(
+    factory: Callable[[int], Any],
+    operation: str,
+    keys: list,
+    values: list,
+    misses: list,
+    repeat: int = 3,
+) -> float:
+    """Return the best time of ``repeat`` runs, in nanoseconds per item"""
+    best = float("inf")
+
+    for _ in range(repeat):
+        gc.collect()
+        best = min(best, OPERATIONS[operation](factory, keys, values, misses))
+
+    return best / len(keys) * 1e9
+
+
+def bytes_per_entry(factory: Callable[[int], Any], keys: list, values: list) -> float:
+    """Measure the memory a filled table allocates beyond its keys and values"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        table = _fill(factory, keys, values)
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del table
+    return (after - before) / len(keys)
+
+
+def run(
+    sizes: list[int],
+    key_types: list[str],
+    tables: list[str],
+    operations: list[str],
+    repeat: int = 3,
+    memory: bool = True,
+) -> list[Result]:
+    results = []
+
+    for size in sizes:
+        for key_type in key_types:
+            keys = _make_keys(key_type, size)
+            misses = _make_keys(key_type, 2 * size)[size:]
+            values = list(range(size))
+            random.Random(size).shuffle(keys)
+
+            names = [
+                name
+                for name in ["dict", *tables]
+                if key_type in KEY_TYPES_SUPPORTED.get(name, {key_type})
+            ]
+            names = list(dict.fromkeys(names))
+
+            for operation in operations:
+                baseline = 0.0
+                for name in names:
+                    elapsed = time_operation(
+                        TABLES[name], operation, keys, values, misses, repeat
+                    )
+                    baseline = baseline or elapsed
+                    results.append(
+                        Result(
+                            name,
+                            key_type,
+                            size,
+                            operation,
+                            elapsed,
+                            "ns/item",
+                            elapsed / baseline,
+                        )
+                    )
+
+            if memory:
+                baseline = 0.0
+                for name in names:
+                    used = bytes_per_entry(TABLES[name], keys, values)
+                    baseline = baseline or used
+                    results.append(
+                        Result(
+                            name,
+                            key_type,
+                            size,
+                            "memory",
+                            used,
+                            "bytes/entry",
+                            used / baseline,
+                        )
+                    )
+
+    return results
+
+
+def display_results(results: list[Result]) -> None:
+    print(
+        f"{'table':<26} {'keys':<10} {'size':>10} {'operation':<12}"
+        f" {'value':>10} {'unit':<11} {'vs dict':>8}"
+    )
+    for result in results:
+        print(
+            f"{result.table:<26} {result.key_type:<10} {result.size:>10}"
+            f" {result.operation:<12} {result.measure:>10.1f} {result.unit:<11}"
+            f" {result.ratio:>7.2f}x"
+        )
+
+
+def read_user_cli_args() -> Namespace:
+    parser = ArgumentParser(
+        prog="benchmark_hashtable",
+        description="benchmark hashtable operations against the built-in dict",
+    )
+    parser.add_argument(
+        "--sizes", metavar="N", nargs="+", type=int, default=list(SIZES[:3])
+    )
+    parser.add_argument(
+        "--key-types",
+        nargs="+",
+        choices=("int", "str", "tuple", "collision"),
+        default=["int", "str", "tuple", "collision"],
+    )
+    parser.add_argument(
+        "--tables", nargs="+", choices=list(TABLES), default=list(TABLES)[1:]
+    )
+    parser.add_argument(
+        "--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip memory measurements"
+    )
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    user_args = read_user_cli_args()
+    display_results(
+        run(
+            user_args.sizes,
+            user_args.key_types,
+            user_args.tables,
+            user_args.operations,
+            user_args.repeat,
+            not user_args.no_memory,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+"""A bounded hashtable for caching, with LRU or LFU eviction and TTLs"""
+
+import sys
+from collections import OrderedDict
+from functools import wraps
+from time import monotonic
+from typing import Any, Callable, Hashable, Iterable, NamedTuple
+
+from hashtable import HashTable
+
+POLICIES = ("lru", "lfu")
+NEVER = float("inf")
+
+_MISSING = object()
+_KWARGS_MARK = object()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    nbytes: int
+
+
+def _sizeof(key: Hashable, value: Any) -> int:
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class CacheHashTable(HashTable):
+    """A hashtable that evicts entries to stay within a size limit
+
+    The limit is a number of entries (``max_size``), an estimate of their
+    memory (``max_bytes``, measured with ``sizeof``), or both. With the
+    ``"lru"`` policy a hit moves its entry to the end of the dense,
+    insertion-ordered storage, so the least recently used entry is always
+    the first live one and iteration goes from oldest to newest. With
+    ``"lfu"`` the entries are also grouped by use count, and the least
+    recently used of the least frequently used entries goes first.
+
+    Entries can expire ``ttl`` seconds after they were stored. Expired
+    entries are dropped when they are looked up, or all at once by
+    ``expire()``, so until then they still count towards ``len``.
+    """
+
+    _STORAGE = HashTable._STORAGE + ("_expires", "_sizes", "_counts")
+
+    def __init__(
+        self,
+        capacity: int = 8,
+        max_size: int | None = 128,
+        max_bytes: int | None = None,
+        policy: str = "lru",
+        ttl: float | None = None,
+        load_threshold: float | None = None,
+        sizeof: Callable[[Hashable, Any], int] = _sizeof,
+        timer: Callable[[], float] = monotonic,
+    ) -> None:
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size should be positive integer")
+
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes should be positive integer")
+
+        if policy not in POLICIES:
+            raise ValueError(f"unknown eviction policy: {policy!r}")
+
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl should be positive")
+
+        super().__init__(capacity, load_threshold)
+        self._max_size = max_size
+        self._max_bytes = max_bytes
+        self._policy = policy
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._timer = timer
+        self._expires: list[float | None] = []
+        self._sizes: list[int | None] = []
+        self._counts: list[int | None] = []
+        self._nbytes = 0
+        self._head = 0
+        self._frequencies: dict[int, OrderedDict[Hashable, None]] = {}
+        self._min_frequency = 0
+        self.reset_stats()
+
+    @property
+    def max_size(self) -> int | None:
+        return self._max_size
+
+    @property
+    def max_bytes(self) -> int | None:
+        return self._max_bytes
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def ttl(self) -> float | None:
+        return self._ttl
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self._hits,
+            self._misses,
+            self._evictions,
+            self._expirations,
+            len(self),
+            self._nbytes,
+        )
+
+    def reset_stats(self) -> None:
+        self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def _constructor_args(self) -> tuple:
+        return (
+            self._min_capacity,
+            self._max_size,
+            self._max_bytes,
+            self._policy,
+            self._ttl,
+            self._load_threshold,
+            self._sizeof,
+            self._timer,
+        )
+
+    def _copy_index(self) -> None:
+        super()._copy_index()
+        self._frequencies = {
+            count: OrderedDict(keys) for count, keys in self._frequencies.items()
+        }
+
+    def _compact(self) -> None:
+        super()._compact()
+        self._head = 0
+
+    def _remember_frequency(self, key: Hashable, count: int) -> None:
+        self._frequencies.setdefault(count, OrderedDict())[key] = None
+
+    def _forget_frequency(self, key: Hashable, count: int) -> None:
+        keys = self._frequencies[count]
+        del keys[key]
+
+        if not keys:
+            del self._frequencies[count]
+
+    def _find(self, key: Hashable) -> int:
+        """Return the position of the key's entry, dropping it if expired"""
+        index = self._lookup(key, hash(key))
+
+        if index != -1:
+            expires = self._expires[index]
+
+            if expires < NEVER and expires <= self._timer():
+                self._remove(index)
+                self._expirations += 1
+                self._maybe_shrink()
+                return -1
+
+        return index
+
+    def _touch(self, index: int) -> None:
+        """Record a use of the entry at ``index``"""
+        if self._storage_refs[0] > 1:
+            self._detach()
+
+        key = self._keys[index]
+
+        if self._policy == "lfu":
+            count = self._counts[index]
+            self._forget_frequency(key, count)
+            self._remember_frequency(key, count + 1)
+            self._counts[index] = count + 1
+
+            if self._min_frequency == count and count not in self._frequencies:
+                self._min_frequency = count + 1
+
+        if index == len(self._hashes) - 1:
+            return
+
+        # move the entry to the end, keeping the dense storage in LRU order
+        hash_ = self._hashes[index]
+        self._delete_index(key, hash_)
+        self._insert_index(hash_, len(self._hashes))
+
+        for name in self._STORAGE:
+            storage = getattr(self, name)
+            storage.append(storage[index])
+            storage[index] = None
+
+        self._maybe_shrink()
+
+    def _remove(self, index: int) -> None:
+        if self._storage_refs[0] > 1:
+            self._detach()
+
+        key = self._keys[index]
+        self._delete_index(key, self._hashes[index])
+
+        if self._policy == "lfu":
+            self._forget_frequency(key, self._counts[index])
+
+        self._nbytes -= self._sizes[index]
+
+        for name in self._STORAGE:
+            getattr(self, name)[index] = None
+
+        self._used -= 1
+
+    def _evict(self) -> None:
+        if self._policy == "lru":
+            hashes = self._hashes
+
+            while hashes[self._head] is None:
+                self._head += 1
+
+            index = self._head
+        else:
+            if self._min_frequency not in self._frequencies:
+                self._min_frequency = min(self._frequencies)
+
+            key = next(iter(self._frequencies[self._min_frequency]))
+            index = self._lookup(key, hash(key))
+
+        self._remove(index)
+        self._evictions += 1
+
+    def _is_full(self, size: int) -> bool:
+        """Tell whether an entry of ``size`` bytes needs an eviction first"""
+        if self._max_size is not None and self._used >= self._max_size:
+            return True
+
+        return self._max_bytes is not None and self._nbytes + size > self._max_bytes
+
+    def _store(self, hash_: int, key: Hashable, value: Any, ttl: float | None) -> None:
+        if self._storage_refs[0] > 1:
+            self._detach()
+
+        size = 0 if self._max_bytes is None else self._sizeof(key, value)
+        expires = NEVER if ttl is None else self._timer() + ttl
+        index = self._lookup(key, hash_)
+
+        if self._max_bytes is not None and size > self._max_bytes:
+            # too big to ever fit, so do not keep a stale value either
+            if index != -1:
+                self._remove(index)
+                self._maybe_shrink()
+            return
+
+        if index != -1:
+            self._nbytes += size - self._sizes[index]
+            self._values[index] = value
+            self._expires[index] = expires
+            self._sizes[index] = size
+            self._touch(index)
+        else:
+            while self._used and self._is_full(size):
+                self._evict()
+
+            self._maybe_shrink()
+            self._insert_index(hash_, len(self._hashes))
+            self._hashes.append(hash_)
+            self._keys.append(key)
+            self._values.append(value)
+            self._expires.append(expires)
+            self._sizes.append(size)
+            self._counts.append(1)
+            self._used += 1
+            self._nbytes += size
+
+            if self._policy == "lfu":
+                self._remember_frequency(key, 1)
+                self._min_frequency = 1
+
+            self._maybe_grow()
+
+        # evicting other entries can still leave too many bytes behind
+        while self._max_bytes is not None and self._nbytes > self._max_bytes:
+            self._evict()
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store a value that expires after ``ttl`` instead of the default"""
+        self._store(hash(key), key, value, self._ttl if ttl is None else ttl)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._store(hash(key), key, value, self._ttl)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        index = self._find(key)
+
+        if index == -1:
+            self._misses += 1
+            raise KeyError(key)
+
+        self._hits += 1
+        value = self._values[index]
+        self._touch(index)
+
+        return value
+
+    def __delitem__(self, key: Hashable) -> None:
+        index = self._find(key)
+
+        if index == -1:
+            raise KeyError(key)
+
+        self._remove(index)
+        self._maybe_shrink()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._find(key) != -1
+
+    def get_many(self, keys: Iterable[Hashable], default: Any = None) -> list[Any]:
+        return [self.get(key, default) for key in keys]
+
+    def contains_many(self, keys: Iterable[Hashable]) -> list[bool]:
+        return [key in self for key in keys]
+
+    def _insert_many(self, entries: Iterable[tuple[int, Hashable, Any]]) -> None:
+        for hash_, key, value in entries:
+            self._store(hash_, key, value, self._ttl)
+
+    def _load_entries(
+        self, hashes: list[int | None], keys: list[Hashable], values: list[Any]
+    ) -> None:
+        self.clear()
+        self._insert_many(zip(hashes, keys, values))
+
+    def clear(self) -> None:
+        super().clear()
+        self._expires = []
+        self._sizes = []
+        self._counts = []
+        self._nbytes = 0
+        self._head = 0
+        self._frequencies = {}
+        self._min_frequency = 0
+
+    def expire(self) -> int:
+        """Drop every expired entry and return how many there were"""
+        now = self._timer()
+        expired = [
+            index
+            for index, (hash_, expires) in enumerate(zip(self._hashes, self._expires))
+            if hash_ is not None and expires <= now
+        ]
+
+        for index in expired:
+            self._remove(index)
+
+        self._expirations += len(expired)
+        self._maybe_shrink()
+
+        return len(expired)
+
+
+def memoize(cache: CacheHashTable | None = None) -> Callable:
+    """Cache a function's results in a ``CacheHashTable``, keyed by arguments
+
+    The arguments have to be hashable. The cache is available as the
+    ``cache`` attribute of the decorated function, for example to read
+    its ``stats``.
+    """
+    if cache is None:
+        cache = CacheHashTable()
+
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (*args, _KWARGS_MARK, *kwargs.items()) if kwargs else args
+            value = cache.get(key, _MISSING)
+
+            if value is _MISSING:
+                value = cache[key] = function(*args, **kwargs)
+
+            return value
+
+        wrapper.cache = cache  # type: ignore
+        return wrapper
+
+    return decorator
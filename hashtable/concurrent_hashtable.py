@@ -0,0 +1,205 @@
+"""A thread-safe hashtable built from lock-striped segments"""
+
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable
+
+from hashtable import HASH_MASK, PARTITION_MULTIPLIER, HashTable, Pair
+
+SEGMENTS = 16
+
+
+class ConcurrentHashTable:
+    """A hashtable that can be shared between threads
+
+    Keys are spread over independent segments, each a ``HashTable``
+    guarded by its own lock, so operations on different segments never
+    wait for each other. Every segment grows and shrinks on its own,
+    which means a resize only blocks the keys of one segment.
+
+    Composite operations such as ``setdefault``, ``pop`` and
+    ``compute_if_absent`` run entirely under the segment lock and are
+    therefore atomic. Whole-table operations (``len``, iteration, views)
+    visit the segments one by one and are not a consistent snapshot.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 8 * SEGMENTS,
+        segments: int = SEGMENTS,
+        table_class: type[HashTable] = HashTable,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity should be positive integer")
+
+        if segments <= 0 or segments & (segments - 1):
+            raise ValueError("segments should be a power of two")
+
+        self._table_class = table_class
+        self._shift = 64 - (segments.bit_length() - 1)
+        self._segments = [
+            table_class(max(1, capacity // segments)) for _ in range(segments)
+        ]
+        self._locks = [Lock() for _ in range(segments)]
+
+    @property
+    def capacity(self) -> int:
+        return sum(segment.capacity for segment in self._segments)
+
+    @property
+    def segments(self) -> int:
+        return len(self._segments)
+
+    def _segment_index(self, key: Hashable) -> int:
+        hash_ = (hash(key) * PARTITION_MULTIPLIER) & HASH_MASK
+        return hash_ >> self._shift
+
+    def _segment(self, key: Hashable) -> tuple[Lock, HashTable]:
+        index = self._segment_index(key)
+        return self._locks[index], self._segments[index]
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        lock, segment = self._segment(key)
+
+        with lock:
+            segment[key] = value
+
+    def __getitem__(self, key: Hashable) -> Any:
+        lock, segment = self._segment(key)
+
+        with lock:
+            return segment[key]
+
+    def __delitem__(self, key: Hashable) -> None:
+        lock, segment = self._segment(key)
+
+        with lock:
+            del segment[key]
+
+    def __contains__(self, key: Hashable) -> bool:
+        lock, segment = self._segment(key)
+
+        with lock:
+            return key in segment
+
+    def __iter__(self):
+        for key, _ in self.iteritems():
+            yield key
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+
+        if isinstance(other, dict):
+            return dict(self.pairs) == other
+
+        if isinstance(other, (HashTable, ConcurrentHashTable)):
+            return dict(self.pairs) == dict(other.pairs)
+
+        return False
+
+    def __str__(self) -> str:
+        return f"{{{', '.join(f'{key!r}: {value!r}' for key, value in self.pairs)}}}"
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}.from_dict({str(self)})"
+
+    @property
+    def pairs(self) -> list[Pair]:
+        return [Pair(key, value) for key, value in self.iteritems()]
+
+    @property
+    def keys(self) -> list[Hashable]:
+        return [key for key, _ in self.iteritems()]
+
+    @property
+    def values(self) -> list[Any]:
+        return [value for _, value in self.iteritems()]
+
+    def iteritems(self):
+        """Yield key-value pairs, copying one segment at a time"""
+        for lock, segment in zip(self._locks, self._segments):
+            with lock:
+                items = list(segment.iteritems())
+            yield from items
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        lock, segment = self._segment(key)
+
+        with lock:
+            return segment.get(key, default)
+
+    def setdefault(self, key: Hashable, default: Any, /) -> Any:
+        lock, segment = self._segment(key)
+
+        with lock:
+            return segment.setdefault(key, default)
+
+    def pop(self, key: Hashable, /, default: Any = None) -> Any:
+        lock, segment = self._segment(key)
+
+        with lock:
+            return segment.pop(key, default)
+
+    def compute_if_absent(self, key: Hashable, factory: Callable[[Hashable], Any]):
+        """Return the key's value, storing ``factory(key)`` first if missing
+
+        The factory runs under the segment lock, so it is called at most
+        once per key even when many threads ask for it concurrently. It
+        must not access this table.
+        """
+        lock, segment = self._segment(key)
+
+        with lock:
+            index = segment._lookup(key, hash(key))
+
+            if index != -1:
+                return segment._values[index]
+
+            value = segment[key] = factory(key)
+            return value
+
+    @classmethod
+    def from_dict(cls, source: dict, capacity: int | None = None):
+        new = cls(capacity or max(len(source), SEGMENTS))
+        new.update(source)
+        return new
+
+    def copy(self):
+        new = self.__class__(self.capacity, self.segments, self._table_class)
+
+        for index, (lock, segment) in enumerate(zip(self._locks, self._segments)):
+            with lock:
+                new._segments[index] = segment.copy()
+
+        return new
+
+    def clear(self) -> None:
+        for lock, segment in zip(self._locks, self._segments):
+            with lock:
+                segment.clear()
+
+    def update(self, other: object = None, /, **kwargs) -> None:
+        if other is None:
+            other = kwargs
+        elif kwargs:
+            raise ValueError()
+
+        if isinstance(other, dict):
+            items: Iterable = other.items()
+        elif isinstance(other, (HashTable, ConcurrentHashTable)):
+            items = other.iteritems()
+        else:
+            raise TypeError("incompatible object")
+
+        # group the items so that each segment lock is taken only once
+        batches: list[list] = [[] for _ in self._segments]
+        for key, value in items:
+            batches[self._segment_index(key)].append((key, value))
+
+        for lock, segment, batch in zip(self._locks, self._segments, batches):
+            if batch:
+                with lock:
+                    segment.update(dict(batch))
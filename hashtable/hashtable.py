@@ -1,10 +1,45 @@
 """This is a hashtable"""
 
-from collections import deque
-from typing import Any, Hashable, NamedTuple
+import pickle
+import struct
+import sys
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
+from itertools import compress
+from typing import Any, BinaryIO, Callable, Hashable, Iterable, Iterator, NamedTuple
 
 DUMMY_STATE = -1
+EMPTY_STATE = -2
 LOAD_THRESHOLD = 0.66
+GROWTH_FACTOR = 2
+PROBING_STRATEGIES = ("linear", "quadratic")
+NUMERIC_TYPECODES = "bBhHiIlLqQfd"
+
+FIBONACCI_MULTIPLIER = 11400714819323198485  # 2**64 / golden ratio
+HASH_MASK = 2**64 - 1
+# tables split into segments or shards pick them from the top bits of a
+# product with this other multiplier, so that the keys of one segment
+# still spread over all of its buckets
+PARTITION_MULTIPLIER = 0xD6E8FEB86659FD93
+
+SERIAL_MAGIC = b"HTBL"
+SERIAL_VERSION = 1
+SERIAL_HEADER = struct.Struct("<4sBBxxqQ")
+BLOB_LENGTH = struct.Struct("<Q")
+FLAG_COMPRESSED = 1
+FLAG_BIG_ENDIAN = 2
+
+# str and bytes hashes are salted per process, so cached hashes can only be
+# reused by a process whose hash of this probe matches
+_HASH_SEED_PROBE = hash("hashtable")
+
+# types whose hash depends only on their value, unlike objects hashed by
+# identity or float("nan"), so a stored hash still matches after unpickling
+_VALUE_HASHED_TYPES = (int, bool, str, bytes)
+
+_MISSING = object()
 
 
 class Pair(NamedTuple):
@@ -12,80 +47,295 @@ class Pair(NamedTuple):
     value: Any
 
 
+class ProbeStats(NamedTuple):
+    histogram: dict[int, int]
+    max_probe_length: int
+    mean_probe_length: float
+    collision_rate: float
+
+
+class _HashTableView(ABC):
+    """A live, read-only view over the entries of a hashtable
+
+    Views iterate the underlying storage directly instead of copying it,
+    and compare equal to any list or tuple holding the same items.
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: "HashTable") -> None:
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    @abstractmethod
+    def __iter__(self):
+        """Iterate over the table's current entries"""
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (_HashTableView, list, tuple)):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+
+class KeysView(_HashTableView):
+    """A view over the keys of a hashtable"""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._table.iterkeys()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._table
+
+
+class ValuesView(_HashTableView):
+    """A view over the values of a hashtable"""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._table.itervalues()
+
+
+class PairsView(_HashTableView):
+    """A view over the key-value pairs of a hashtable"""
+
+    __slots__ = ()
+
+    def __iter__(self):
+        for key, value in self._table.iteritems():
+            yield Pair(key, value)
+
+    def __contains__(self, pair: object) -> bool:
+        try:
+            key, value = pair  # type: ignore
+            return self._table[key] == value
+        except (TypeError, ValueError, KeyError):
+            return False
+
+
 class HashTable:
-    """A hashtable implementation"""
+    """A hashtable implementation
+
+    Entries are kept in insertion order in three dense parallel lists of
+    hashes, keys and values, while the buckets only hold positions into
+    them. A bucket is ``None`` until a key lands in it and is dropped again
+    once emptied, so empty buckets cost a single pointer. Deleting an
+    entry leaves a hole (a hash of ``None``) that gets squeezed out once
+    holes outnumber live entries.
+
+    ``copy()`` returns a copy-on-write snapshot: both tables share their
+    storage, and whichever of them is written to first takes a private
+    copy of it.
+
+    The table grows geometrically once the load factor exceeds
+    ``load_threshold`` and shrinks back after mass deletions, but never
+    below the capacity it was created with.
+    """
+
+    DEFAULT_LOAD_THRESHOLD = 1.0
+    _STORAGE = ("_hashes", "_keys", "_values")
 
-    def __init__(self, capacity: int = 8) -> None:
+    def __init__(self, capacity: int = 8, load_threshold: float | None = None) -> None:
         if capacity <= 0:
             raise ValueError("capacity should be positive integer")
 
-        self._buckets: list[deque[Pair]] = [deque() for _ in range(capacity)]
-        self._key_insertion_order: list[Hashable] = []
+        self._load_threshold = self._validate_load_threshold(load_threshold)
+        self._min_capacity = capacity
+        self._used = 0
+        self._storage_refs = [1]
+        self._hashes: list[int | None] = []
+        self._keys: list[Hashable] = []
+        self._values: list[Any] = []
+        self._buckets: list[list[int] | None] = [None] * capacity
+
+    @classmethod
+    def _validate_load_threshold(cls, load_threshold: float | None) -> float:
+        if load_threshold is None:
+            return cls.DEFAULT_LOAD_THRESHOLD
+
+        if load_threshold <= 0:
+            raise ValueError("load_threshold should be positive")
+
+        return load_threshold
 
     def __len__(self) -> int:
-        return len(self.pairs)
+        return self._used
 
     @property
     def capacity(self) -> int:
         return len(self._buckets)
 
     @property
-    def pairs(self) -> list[Pair]:
-        return [Pair(key, self[key]) for key in self._key_insertion_order]
+    def pairs(self) -> PairsView:
+        return PairsView(self)
 
     @property
-    def keys(self) -> list[Hashable]:
-        return [pair.key for pair in self.pairs]
+    def keys(self) -> KeysView:
+        return KeysView(self)
 
     @property
-    def values(self) -> list[Any]:
-        return [pair.value for pair in self.pairs]
+    def values(self) -> ValuesView:
+        return ValuesView(self)
 
     @property
     def load_factor(self) -> float:
         return len(self) / self.capacity
 
-    def _index(self, key: Hashable) -> int:
-        return hash(key) % self.capacity
+    @property
+    def load_threshold(self) -> float:
+        return self._load_threshold
+
+    def _index(self, hash_: int) -> int:
+        # Fibonacci hashing spreads keys that differ only in their high bits,
+        # such as integers with a common stride, and scaling the mixed 64 bits
+        # by the capacity keeps the top ones: a shift for powers of two
+        return ((hash_ * FIBONACCI_MULTIPLIER & HASH_MASK) * self.capacity) >> 64
+
+    def _lookup(self, key: Hashable, hash_: int) -> int:
+        """Return the position of the key's entry, or -1 when missing"""
+        hashes, keys = self._hashes, self._keys
+
+        for index in self._buckets[self._index(hash_)] or ():
+            if hashes[index] == hash_ and (keys[index] is key or keys[index] == key):
+                return index
+
+        return -1
+
+    def _insert_index(self, hash_: int, index: int) -> None:
+        bucket = self._index(hash_)
+        queue = self._buckets[bucket]
+
+        if queue is None:
+            self._buckets[bucket] = [index]
+        else:
+            queue.append(index)
+
+    def _delete_index(self, key: Hashable, hash_: int) -> int:
+        hashes, keys = self._hashes, self._keys
+        bucket = self._index(hash_)
+        queue = self._buckets[bucket] or []
+
+        for position, index in enumerate(queue):
+            if hashes[index] == hash_ and (keys[index] is key or keys[index] == key):
+                del queue[position]
+                if not queue:
+                    self._buckets[bucket] = None
+                return index
+
+        return -1
+
+    def _move_index(self, hash_: int, old_index: int, new_index: int) -> None:
+        queue = self._buckets[self._index(hash_)]
+        queue[queue.index(old_index)] = new_index  # type: ignore
+
+    def _copy_index(self) -> None:
+        self._buckets = [queue and queue[:] for queue in self._buckets]
+
+    def _hash_at(self, index: int) -> int:
+        return self._hashes[index]  # type: ignore
+
+    def _live_positions(self) -> list[int]:
+        return [index for index, hash_ in enumerate(self._hashes) if hash_ is not None]
+
+    def _probe_lengths(self) -> Iterable[int]:
+        """Yield how many entries a lookup compares against for each key"""
+        for queue in self._buckets:
+            if queue:
+                yield from range(1, len(queue) + 1)
+
+    def probe_stats(self) -> ProbeStats:
+        """Measure how far lookups of the stored keys have to search
+
+        A probe length of one means the key sits in its home bucket or slot;
+        the collision rate is the share of keys that do not.
+        """
+        histogram = Counter(self._probe_lengths())
+        total = sum(histogram.values())
+
+        if not total:
+            return ProbeStats({}, 0, 0.0, 0.0)
+
+        return ProbeStats(
+            dict(sorted(histogram.items())),
+            max(histogram),
+            sum(length * count for length, count in histogram.items()) / total,
+            1 - histogram[1] / total,
+        )
+
+    def _release_storage(self) -> None:
+        self._storage_refs[0] -= 1
+        self._storage_refs = [1]
+
+    def _detach(self) -> None:
+        """Take a private copy of storage shared with snapshots"""
+        self._release_storage()
+
+        for name in self._STORAGE:
+            setattr(self, name, getattr(self, name)[:])
+
+        self._copy_index()
+
+    def _rebuild_index(self, capacity: int) -> None:
+        self._buckets = [None] * capacity
+
+        for index, hash_ in enumerate(self._hashes):
+            if hash_ is not None:
+                self._insert_index(hash_, index)
 
     def __setitem__(self, key: Hashable, value: Any) -> None:
-        queue = self._buckets[self._index(key)]
+        if self._storage_refs[0] > 1:
+            self._detach()
 
-        for idx, pair in enumerate(queue):
-            if hash(pair.key) == hash(key):
-                queue[idx] = Pair(key, value)
-                return
+        hash_ = hash(key)
+        index = self._lookup(key, hash_)
+
+        if index != -1:
+            self._values[index] = value
+            return
 
-        queue.append(Pair(key, value))
-        self._key_insertion_order.append(key)
+        self._insert_index(hash_, len(self._hashes))
+        self._hashes.append(hash_)
+        self._keys.append(key)
+        self._values.append(value)
+        self._used += 1
+        self._maybe_grow()
 
     def __getitem__(self, key: Hashable) -> Any:
-        for pair in self._buckets[self._index(key)]:
-            if hash(key) == hash(pair.key):
-                return pair.value
+        index = self._lookup(key, hash(key))
+
+        if index == -1:
+            raise KeyError(key)
 
-        raise KeyError(key)
+        return self._values[index]
 
     def __delitem__(self, key: Hashable) -> None:
-        queue = self._buckets[self._index(key)]
+        if self._storage_refs[0] > 1:
+            self._detach()
 
-        for pair in queue:
-            if hash(pair.key) == hash(key):
-                queue.remove(pair)
-                self._key_insertion_order.remove(key)
-                return
+        index = self._delete_index(key, hash(key))
+
+        if index == -1:
+            raise KeyError(key)
 
-        raise KeyError(key)
+        self._hashes[index] = None
+        self._keys[index] = None
+        self._values[index] = None
+        self._used -= 1
+        self._maybe_shrink()
 
     def __contains__(self, key: Hashable) -> bool:
-        try:
-            self[key]
-        except KeyError:
-            return False
-        return True
+        return self._lookup(key, hash(key)) != -1
 
     def __iter__(self):
-        yield from iter(self._key_insertion_order)
+        return self.iterkeys()
 
     def __str__(self) -> str:
         return f"{{{', '.join(f'{key!r}: {value!r}' for key, value in self.pairs)}}}"
@@ -97,42 +347,239 @@ class HashTable:
         if self is other:
             return True
 
+        if not isinstance(other, (dict, HashTable)) or len(self) != len(other):
+            return False
+
+        # equal sizes mean that finding every entry in the other is enough
+        if isinstance(other, dict):
+            for key, value in self.iteritems():
+                found = other.get(key, _MISSING)
+                if found is _MISSING or not (found is value or found == value):
+                    return False
+            return True
+
+        values = other._values
+        for hash_, key, value in self._iterentries():
+            index = other._lookup(key, hash_)
+            if index == -1 or not (values[index] is value or values[index] == value):
+                return False
+
+        return True
+
+    def _iterentries(self) -> Iterator[tuple[int, Hashable, Any]]:
+        """Yield the hash, key and value of every entry"""
+        for hash_, key, value in zip(self._hashes, self._keys, self._values):
+            if hash_ is not None:
+                yield hash_, key, value
+
+    @staticmethod
+    def _entries_of(other: object) -> Iterator[tuple[int, Hashable, Any]]:
+        if isinstance(other, dict):
+            return zip(map(hash, other), other.keys(), other.values())
+
+        if isinstance(other, HashTable):
+            return other._iterentries()
+
+        raise TypeError("incompatible object")
+
+    @staticmethod
+    def _has_entry(other: Any, key: Hashable, hash_: int) -> bool:
         if isinstance(other, dict):
-            return set(self.pairs) == set(other.items())
+            return key in other
+
+        return other._lookup(key, hash_) != -1
+
+    def _new_from_entries(self, entries: Iterable[tuple[int, Hashable, Any]]):
+        new = self.__class__(*self._constructor_args())
+        new._insert_many(entries)
+        return new
+
+    def __or__(self, other: object):
+        """Return the keys of both, taking values from the right on conflicts"""
+        if not isinstance(other, (dict, HashTable)):
+            return NotImplemented
+
+        new = self.copy()
+        new.merge(other)
+        return new
+
+    def __ior__(self, other: object):
+        if not isinstance(other, (dict, HashTable)):
+            return NotImplemented
+
+        self.merge(other)
+        return self
+
+    def __and__(self, other: object):
+        """Return this table's entries whose keys are also in the other"""
+        if not isinstance(other, (dict, HashTable)):
+            return NotImplemented
+
+        return self._new_from_entries(
+            entry
+            for entry in self._iterentries()
+            if self._has_entry(other, entry[1], entry[0])
+        )
+
+    def __sub__(self, other: object):
+        """Return this table's entries whose keys are not in the other"""
+        if not isinstance(other, (dict, HashTable)):
+            return NotImplemented
+
+        return self._new_from_entries(
+            entry
+            for entry in self._iterentries()
+            if not self._has_entry(other, entry[1], entry[0])
+        )
+
+    def __xor__(self, other: object):
+        """Return the entries whose keys are in exactly one of the two"""
+        if not isinstance(other, (dict, HashTable)):
+            return NotImplemented
+
+        new = self - other
+        new._insert_many(
+            entry
+            for entry in self._entries_of(other)
+            if self._lookup(entry[1], entry[0]) == -1
+        )
+        return new
+
+    def merge(
+        self,
+        other: object,
+        resolve: Callable[[Hashable, Any, Any], Any] | None = None,
+    ) -> None:
+        """Insert another table's entries, resolving keys present in both
+
+        ``resolve(key, current, incoming)`` returns the value to keep, and
+        without it the incoming value wins, as in ``update``.
+        """
+        entries = self._entries_of(other)
+        self._reserve(len(self) + len(other))  # type: ignore
+
+        if resolve is not None:
+            entries = self._resolve_conflicts(entries, resolve)
+
+        self._insert_many(entries)
 
-        if isinstance(other, self.__class__):
-            return set(self.pairs) == set(other.pairs)
+    def _resolve_conflicts(
+        self,
+        entries: Iterable[tuple[int, Hashable, Any]],
+        resolve: Callable[[Hashable, Any, Any], Any],
+    ) -> Iterator[tuple[int, Hashable, Any]]:
+        for hash_, key, value in entries:
+            index = self._lookup(key, hash_)
 
-        return False
+            if index != -1:
+                value = resolve(key, self._values[index], value)
 
-    # def _probe(self, key: Hashable):
-    #     """A helper method"""
-    #     index = self._index(key)
+            yield hash_, key, value
 
-    #     for _ in range(self.capacity):
-    #         yield index, self._slots[index]
-    #         index = (index + 1) % self.capacity
+    def _maybe_grow(self) -> None:
+        if len(self) > self.capacity * self._load_threshold:
+            self._resize_and_rehash(self.capacity * GROWTH_FACTOR)
 
-    # def _resize_and_rehash(self) -> None:
-    #     if len(self) == self.capacity:
-    #         new_capacity = self.capacity + (self.capacity >> 3)
+    def _maybe_shrink(self) -> None:
+        if (
+            self.capacity > self._min_capacity
+            and len(self) < self.capacity * self._load_threshold / 4
+        ):
+            self._resize_and_rehash(
+                max(self._min_capacity, self.capacity // GROWTH_FACTOR)
+            )
+        elif len(self._keys) - len(self) > len(self):
+            self._compact_in_place()
 
-    #         if new_capacity == self.capacity:
-    #             new_capacity += 1
-    #     elif self._slots.count(DUMMY_STATE) > (self.capacity >> 1):
-    #         new_capacity = max(8, self.capacity >> 1)
+    def _capacity_for(self, size: int) -> int:
+        capacity = self.capacity
 
-    #         if new_capacity == self.capacity:
-    #             return
-    #     else:
-    #         return
+        while size > capacity * self._load_threshold:
+            capacity *= GROWTH_FACTOR
 
-    #     old_slots = self._slots
-    #     self._slots = [None] * new_capacity
+        return capacity
 
-    #     for slot in old_slots:
-    #         if isinstance(slot, Pair):
-    #             self[slot.key] = slot.value
+    def _reserve(self, size: int) -> None:
+        """Resize once up front so that ``size`` entries fit without growing"""
+        capacity = self._capacity_for(size)
+
+        if capacity != self.capacity:
+            self._resize_and_rehash(capacity)
+
+    def _load_entries(
+        self, hashes: list[int | None], keys: list[Hashable], values: list[Any]
+    ) -> None:
+        """Adopt lists of distinct entries wholesale, then index them once"""
+        self._release_storage()
+        self._hashes, self._keys, self._values = hashes, keys, values
+        self._used = len(hashes)
+        self._resize_and_rehash(self._capacity_for(self._used))
+
+    def _insert_many(self, entries: Iterable[tuple[int, Hashable, Any]]) -> None:
+        """Insert hashed entries, later duplicates overwriting earlier ones"""
+        if self._storage_refs[0] > 1:
+            self._detach()
+
+        lookup, insert_index = self._lookup, self._insert_index
+        hashes, keys, values = self._hashes, self._keys, self._values
+
+        for hash_, key, value in entries:
+            index = lookup(key, hash_)
+
+            if index != -1:
+                values[index] = value
+                continue
+
+            insert_index(hash_, len(hashes))
+            hashes.append(hash_)
+            keys.append(key)
+            values.append(value)
+            self._used += 1
+            self._maybe_grow()
+
+            if hashes is not self._hashes:
+                hashes, keys, values = self._hashes, self._keys, self._values
+
+    def _live_entries(self) -> tuple[list[int | None], list[Hashable], list[Any]]:
+        """Return new lists of the hashes, keys and values of live entries
+
+        Other tables copy these to reuse the cached hashes instead of
+        calling ``__hash__`` again.
+        """
+        live = [hash_ is not None for hash_ in self._hashes]
+
+        return (
+            list(compress(self._hashes, live)),
+            list(compress(self._keys, live)),
+            list(compress(self._values, live)),
+        )
+
+    def _compact(self) -> None:
+        live = [hash_ is not None for hash_ in self._hashes]
+
+        for name in self._STORAGE:
+            setattr(self, name, list(compress(getattr(self, name), live)))
+
+    def _compact_in_place(self) -> None:
+        """Squeeze out the holes and repoint only the moved entries
+
+        Unlike a rehash, this leaves the index where it is, so it costs time
+        in proportion to the dense storage rather than to the capacity.
+        """
+        moved = [(index, self._hash_at(index)) for index in self._live_positions()]
+        self._compact()
+
+        # entries only move towards the front, in order, so an old position
+        # is never mistaken for the new position of an earlier entry
+        for new_index, (old_index, hash_) in enumerate(moved):
+            if new_index != old_index:
+                self._move_index(hash_, old_index, new_index)
+
+    def _resize_and_rehash(self, new_capacity: int) -> None:
+        if len(self._keys) != len(self):
+            self._compact()
+
+        self._rebuild_index(new_capacity)
 
     def get(self, key: Hashable, default: Any = None) -> Any:
         try:
@@ -140,43 +587,190 @@ class HashTable:
         except KeyError:
             return default
 
+    def get_many(self, keys: Iterable[Hashable], default: Any = None) -> list[Any]:
+        """Look up many keys at once, using ``default`` for missing ones
+
+        ``keys`` can be any iterable, including a NumPy array.
+        """
+        keys = list(keys)
+        values = self._values
+
+        return [
+            default if index == -1 else values[index]
+            for index in map(self._lookup, keys, map(hash, keys))
+        ]
+
+    def contains_many(self, keys: Iterable[Hashable]) -> list[bool]:
+        keys = list(keys)
+        return [index != -1 for index in map(self._lookup, keys, map(hash, keys))]
+
+    def set_many(self, keys: Iterable[Hashable], values: Iterable[Any]) -> None:
+        """Insert or update many keys at once, sizing the table only once"""
+        keys, values = list(keys), list(values)
+
+        if len(keys) != len(values):
+            raise ValueError("keys and values should have the same length")
+
+        self._reserve(len(self) + len(keys))
+        self._insert_many(zip(map(hash, keys), keys, values))
+
     @classmethod
     def from_dict(cls, source: dict, capacity: int | None = None):
-        new = cls(capacity or len(source))
+        new = cls(capacity or max(len(source), 1))
+        new.update(source)
+        return new
+
+    @classmethod
+    def from_pairs(
+        cls,
+        pairs: Iterable[tuple[Hashable, Any]],
+        size_hint: int | None = None,
+        capacity: int | None = None,
+    ):
+        """Build a hashtable from key-value pairs, later duplicates winning
 
-        for key, value in source.items():
-            new[key] = value
+        The table is sized once for ``size_hint`` entries (or the length of
+        ``pairs`` when it has one), so streaming sources of known size load
+        without intermediate resizes.
+        """
+        if size_hint is None:
+            size_hint = len(pairs) if hasattr(pairs, "__len__") else 0
 
+        new = cls(capacity or max(size_hint, 1))
+        new._reserve(size_hint)
+        new._insert_many((hash(key), key, value) for key, value in pairs)
         return new
 
     def copy(self):
-        return self.__class__.from_dict(dict(self.pairs), self.capacity)
+        """Return a snapshot sharing this table's storage until either is written"""
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        self._storage_refs[0] += 1
+        return new
 
-    def clear(self) -> None:
-        for idx in range(self.capacity):
-            self._buckets[idx] = deque()
+    def _constructor_args(self) -> tuple:
+        return self._min_capacity, self._load_threshold
+
+    def __reduce__(self):
+        hashes, keys, values = self._live_entries()
+        return _restore_hashtable, (
+            self.__class__,
+            self._constructor_args(),
+            _HASH_SEED_PROBE,
+            array("q", hashes),
+            keys,
+            values,
+        )
+
+    def dump(self, fileobj: BinaryIO, compressed: bool = False) -> None:
+        """Write the table to a binary file object
+
+        The format is a versioned header followed by length-prefixed blobs:
+        the table's class and arguments, the raw array of cached hashes, and
+        the pickled keys and values, optionally compressed with zlib.
+        """
+        hashes, keys, values = self._live_entries()
+        blobs = (
+            pickle.dumps((self.__class__, self._constructor_args())),
+            array("q", hashes).tobytes(),
+            pickle.dumps(keys, protocol=pickle.HIGHEST_PROTOCOL),
+            pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        body = b"".join(BLOB_LENGTH.pack(len(blob)) + blob for blob in blobs)
+
+        flags = FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+        if compressed:
+            body = zlib.compress(body)
+            flags |= FLAG_COMPRESSED
+
+        header = SERIAL_HEADER.pack(
+            SERIAL_MAGIC, SERIAL_VERSION, flags, _HASH_SEED_PROBE, len(body)
+        )
+        fileobj.write(header)
+        fileobj.write(body)
+
+    @classmethod
+    def load(cls, fileobj: BinaryIO):
+        """Read a table written by ``dump``, reusing its hashes when possible
+
+        The keys and values are unpickled, so only load trusted files.
+        """
+        header = fileobj.read(SERIAL_HEADER.size)
+        if len(header) != SERIAL_HEADER.size:
+            raise ValueError("truncated hashtable header")
+
+        magic, version, flags, seed_probe, length = SERIAL_HEADER.unpack(header)
+        if magic != SERIAL_MAGIC:
+            raise ValueError("not a serialized hashtable")
+        if version != SERIAL_VERSION:
+            raise ValueError(f"unsupported hashtable format version: {version}")
 
-        self._key_insertion_order.clear()
+        body = fileobj.read(length)
+        if flags & FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+
+        blobs, offset = [], 0
+        for _ in range(4):
+            (blob_length,) = BLOB_LENGTH.unpack_from(body, offset)
+            offset += BLOB_LENGTH.size
+            blobs.append(body[offset : offset + blob_length])
+            offset += blob_length
+
+        table_class, args = pickle.loads(blobs[0])
+        if not issubclass(table_class, cls):
+            raise TypeError(f"{table_class.__name__} is not a {cls.__name__}")
+
+        hashes = array("q")
+        hashes.frombytes(blobs[1])
+        if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == "big"):
+            hashes.byteswap()
+
+        return _restore_hashtable(
+            table_class,
+            args,
+            seed_probe,
+            hashes,
+            pickle.loads(blobs[2]),
+            pickle.loads(blobs[3]),
+        )
+
+    def clear(self) -> None:
+        self._release_storage()
+        self._used = 0
+        self._hashes = []
+        self._keys = []
+        self._values = []
+        self._rebuild_index(self.capacity)
 
     def update(self, other: object = None, /, **kwargs) -> None:
         # only consider kwargs if other is not given
         if other is None:
-            for k, v in kwargs.items():
-                self[k] = v
-            return
-
+            other = kwargs
         # other and kwargs can not be both empty
-        if kwargs:
+        elif kwargs:
             raise ValueError()
 
         if isinstance(other, dict):
-            for key, value in other.items():
-                self[key] = value
+            # dict keys are distinct, so an empty table can take them as is
+            if not self._used:
+                self._load_entries(
+                    list(map(hash, other)), list(other), list(other.values())
+                )
+                return
+
+            self._reserve(len(self) + len(other))
+            self._insert_many(zip(map(hash, other), other.keys(), other.values()))
             return
 
-        if isinstance(other, self.__class__):
-            for key, value in other.pairs:
-                self[key] = value
+        if isinstance(other, HashTable):
+            hashes, keys, values = other._live_entries()
+
+            if not self._used:
+                self._load_entries(hashes, keys, values)
+                return
+
+            self._reserve(len(self) + len(other))
+            self._insert_many(zip(hashes, keys, values))
             return
 
         raise TypeError("incompatible object")
@@ -200,17 +794,503 @@ class HashTable:
 
     # my own impremetation!
     def iteritems(self):
-        for queue in self._buckets:
-            for pair in queue:
-                yield pair.key, pair.value
+        for hash_, key, value in zip(self._hashes, self._keys, self._values):
+            if hash_ is not None:
+                yield key, value
 
     def iterkeys(self):
-        for queue in self._buckets:
-            for pair in queue:
-                yield pair.key
+        for hash_, key in zip(self._hashes, self._keys):
+            if hash_ is not None:
+                yield key
 
     def itervalues(self):
-        for queue in self._buckets:
-            for pair in queue:
-                yield pair.value
+        for hash_, value in zip(self._hashes, self._values):
+            if hash_ is not None:
+                yield value
     # ...
+
+
+def _round_up_to_power_of_two(number: int) -> int:
+    return 1 << (number - 1).bit_length()
+
+
+class OpenAddressingHashTable(HashTable):
+    """A hashtable using open addressing over a sparse index
+
+    Entries live in the same dense, insertion-ordered lists as in the
+    chained table, and the index is a flat list of slots holding their
+    positions, so no per-item container is allocated. An empty slot is
+    ``None`` and a deleted one is marked with ``DUMMY_STATE``. The capacity
+    is rounded up to a power of two so that quadratic (triangular) probing
+    visits every slot.
+
+    Deleted slots still lengthen probe sequences, so the load that
+    triggers a resize counts them too; a rehash drops them all.
+    """
+
+    DEFAULT_LOAD_THRESHOLD = LOAD_THRESHOLD
+
+    def __init__(
+        self,
+        capacity: int = 8,
+        probing: str = "linear",
+        load_threshold: float | None = None,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity should be positive integer")
+
+        if probing not in PROBING_STRATEGIES:
+            raise ValueError(f"unknown probing strategy: {probing!r}")
+
+        capacity = _round_up_to_power_of_two(capacity)
+
+        self._probing = probing
+        self._load_threshold = self._validate_load_threshold(load_threshold)
+        self._min_capacity = capacity
+        self._used = 0
+        self._filled = 0
+        self._storage_refs = [1]
+        self._hashes: list[int | None] = []
+        self._keys: list[Hashable] = []
+        self._values: list[Any] = []
+        self._indices: list[int | None] = [None] * capacity
+
+    @classmethod
+    def _validate_load_threshold(cls, load_threshold: float | None) -> float:
+        load_threshold = super()._validate_load_threshold(load_threshold)
+
+        if load_threshold >= 1:
+            raise ValueError("load_threshold should be less than 1")
+
+        return load_threshold
+
+    @property
+    def capacity(self) -> int:
+        return len(self._indices)
+
+    @property
+    def probing(self) -> str:
+        return self._probing
+
+    def _probe(self, hash_: int):
+        """Yield slot indices in probing order, visiting each slot once"""
+        mask = self.capacity - 1
+        index = self._index(hash_)
+
+        if self._probing == "linear":
+            for _ in range(self.capacity):
+                yield index
+                index = (index + 1) & mask
+        else:
+            for step in range(1, self.capacity + 1):
+                yield index
+                index = (index + step) & mask
+
+    def _find_slot(self, key: Hashable, hash_: int) -> int:
+        indices, hashes, keys = self._indices, self._hashes, self._keys
+
+        for slot in self._probe(hash_):
+            index = indices[slot]
+
+            if index is None:
+                break
+
+            if (
+                index != DUMMY_STATE
+                and hashes[index] == hash_
+                and (keys[index] is key or keys[index] == key)
+            ):
+                return slot
+
+        return -1
+
+    def _lookup(self, key: Hashable, hash_: int) -> int:
+        slot = self._find_slot(key, hash_)
+        return -1 if slot == -1 else self._indices[slot]  # type: ignore
+
+    def _insert_index(self, hash_: int, index: int) -> None:
+        indices = self._indices
+
+        for slot in self._probe(hash_):
+            if indices[slot] is None:
+                self._filled += 1
+                break
+
+            if indices[slot] == DUMMY_STATE:
+                break
+        else:
+            raise MemoryError("not enough capacity")
+
+        indices[slot] = index
+
+    def _delete_index(self, key: Hashable, hash_: int) -> int:
+        slot = self._find_slot(key, hash_)
+
+        if slot == -1:
+            return -1
+
+        index = self._indices[slot]
+        self._indices[slot] = DUMMY_STATE
+        return index  # type: ignore
+
+    def _rebuild_index(self, capacity: int) -> None:
+        self._indices = [None] * capacity
+        self._filled = 0
+
+        for index, hash_ in enumerate(self._hashes):
+            if hash_ is not None:
+                self._insert_index(hash_, index)
+
+    def _maybe_grow(self) -> None:
+        if self._filled <= self.capacity * self._load_threshold:
+            return
+
+        # mostly tombstones: rehashing in place is enough to free them
+        if len(self) > self.capacity * self._load_threshold / 2:
+            self._resize_and_rehash(self.capacity * GROWTH_FACTOR)
+        else:
+            self._resize_and_rehash(self.capacity)
+
+    def _move_index(self, hash_: int, old_index: int, new_index: int) -> None:
+        indices = self._indices
+
+        for slot in self._probe(hash_):
+            if indices[slot] == old_index:
+                indices[slot] = new_index
+                return
+
+    def _copy_index(self) -> None:
+        self._indices = self._indices[:]
+
+    def _probe_lengths(self) -> Iterable[int]:
+        for slot, index in enumerate(self._indices):
+            if index is None or index < 0:
+                continue
+
+            for length, probed in enumerate(self._probe(self._hash_at(index)), 1):
+                if probed == slot:
+                    yield length
+                    break
+
+    def _constructor_args(self) -> tuple:
+        return self._min_capacity, self._probing, self._load_threshold
+
+
+class RobinHoodHashTable(OpenAddressingHashTable):
+    """An open-addressing hashtable using Robin Hood linear probing
+
+    An insert takes the slot of any entry that sits closer to its home slot
+    than the new one would, and pushes that entry further along instead.
+    This keeps probe lengths nearly equal, so the table stays fast at a
+    load of 0.9, and a lookup can stop as soon as it meets an entry closer
+    to home than itself. Deletes shift the following entries of the cluster
+    back by one slot rather than leaving tombstones.
+    """
+
+    DEFAULT_LOAD_THRESHOLD = 0.9
+
+    def __init__(self, capacity: int = 8, load_threshold: float | None = None) -> None:
+        super().__init__(capacity, "linear", load_threshold)
+
+    def _find_slot(self, key: Hashable, hash_: int) -> int:
+        indices, hashes, keys = self._indices, self._hashes, self._keys
+        mask = self.capacity - 1
+        slot = self._index(hash_)
+
+        for distance in range(self.capacity):
+            index = indices[slot]
+
+            if index is None:
+                break
+
+            if hashes[index] == hash_ and (keys[index] is key or keys[index] == key):
+                return slot
+
+            if (slot - self._index(hashes[index])) & mask < distance:
+                break
+
+            slot = (slot + 1) & mask
+
+        return -1
+
+    def _insert_index(self, hash_: int, index: int) -> None:
+        indices, hashes = self._indices, self._hashes
+        mask = self.capacity - 1
+        slot = self._index(hash_)
+        distance = 0
+
+        for _ in range(self.capacity):
+            current = indices[slot]
+
+            if current is None:
+                indices[slot] = index
+                self._filled += 1
+                return
+
+            current_distance = (slot - self._index(hashes[current])) & mask
+
+            if current_distance < distance:
+                indices[slot], index = index, current
+                distance = current_distance
+
+            slot = (slot + 1) & mask
+            distance += 1
+
+        raise MemoryError("not enough capacity")
+
+    def _delete_index(self, key: Hashable, hash_: int) -> int:
+        slot = self._find_slot(key, hash_)
+
+        if slot == -1:
+            return -1
+
+        indices, hashes = self._indices, self._hashes
+        mask = self.capacity - 1
+        index = indices[slot]
+
+        # shift the rest of the cluster back until an entry is at home
+        following = (slot + 1) & mask
+        while (
+            indices[following] is not None
+            and self._index(hashes[indices[following]]) != following
+        ):
+            indices[slot] = indices[following]
+            slot, following = following, (following + 1) & mask
+
+        indices[slot] = None
+        self._filled -= 1
+        return index  # type: ignore
+
+    def _constructor_args(self) -> tuple:
+        return self._min_capacity, self._load_threshold
+
+
+class IntHashTable(OpenAddressingHashTable):
+    """An open-addressing hashtable specialised for integer keys
+
+    Keys are stored in a dense ``array`` of signed 64-bit integers and
+    values in an ``array`` of ``value_type`` (a numeric typecode, 64-bit
+    floats by default), so entries carry no per-item Python objects. Holes
+    left by deletes are flagged in a ``bytearray`` and the sparse index
+    uses 32-bit slots, which keeps an entry at roughly 20-30 bytes.
+    """
+
+    _STORAGE = ("_keys", "_values", "_live")
+
+    def __init__(
+        self,
+        capacity: int = 8,
+        value_type: str = "d",
+        probing: str = "linear",
+        load_threshold: float | None = None,
+    ) -> None:
+        if value_type not in NUMERIC_TYPECODES:
+            raise ValueError(f"unsupported value type: {value_type!r}")
+
+        super().__init__(capacity, probing, load_threshold)
+
+        self._value_type = value_type
+        self._hashes = None  # type: ignore
+        self._keys = array("q")  # type: ignore
+        self._values = array(value_type)  # type: ignore
+        self._live = bytearray()
+        self._indices = self._empty_index(self.capacity)  # type: ignore
+
+    @staticmethod
+    def _empty_index(capacity: int) -> array:
+        return array("i" if capacity < 2**31 else "q", [EMPTY_STATE]) * capacity
+
+    @property
+    def value_type(self) -> str:
+        return self._value_type
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes taken by the key, value and index buffers"""
+        return (
+            len(self._keys) * self._keys.itemsize
+            + len(self._values) * self._values.itemsize
+            + len(self._live)
+            + len(self._indices) * self._indices.itemsize  # type: ignore
+        )
+
+    def _find_slot(self, key: Hashable, hash_: int) -> int:
+        indices, keys = self._indices, self._keys
+
+        for slot in self._probe(hash_):
+            index = indices[slot]
+
+            if index == EMPTY_STATE:
+                break
+
+            if index != DUMMY_STATE and keys[index] == key:
+                return slot
+
+        return -1
+
+    def _insert_index(self, hash_: int, index: int) -> None:
+        indices = self._indices
+
+        for slot in self._probe(hash_):
+            if indices[slot] == EMPTY_STATE:
+                self._filled += 1
+                break
+
+            if indices[slot] == DUMMY_STATE:
+                break
+        else:
+            raise MemoryError("not enough capacity")
+
+        indices[slot] = index
+
+    def _rebuild_index(self, capacity: int) -> None:
+        self._indices = self._empty_index(capacity)  # type: ignore
+        self._filled = 0
+
+        for index in compress(range(len(self._keys)), self._live):
+            self._insert_index(hash(self._keys[index]), index)
+
+    def _hash_at(self, index: int) -> int:
+        return hash(self._keys[index])
+
+    def _live_positions(self) -> list[int]:
+        return list(compress(range(len(self._keys)), self._live))
+
+    def _iterentries(self) -> Iterator[tuple[int, Hashable, Any]]:
+        for key, value in self.iteritems():
+            yield hash(key), key, value
+
+    def _live_entries(self) -> tuple[list[int | None], list[Hashable], list[Any]]:
+        keys = list(self.iterkeys())
+        return list(map(hash, keys)), keys, list(self.itervalues())
+
+    def _load_entries(
+        self, hashes: list[int | None], keys: list[Hashable], values: list[Any]
+    ) -> None:
+        self._release_storage()
+        self._keys = array("q", keys)  # type: ignore
+        self._values = array(self._value_type, values)  # type: ignore
+        self._live = bytearray(b"\x01") * len(keys)
+        self._used = len(keys)
+        self._resize_and_rehash(self._capacity_for(self._used))
+
+    def _constructor_args(self) -> tuple:
+        return (
+            self._min_capacity,
+            self._value_type,
+            self._probing,
+            self._load_threshold,
+        )
+
+    def _compact(self) -> None:
+        self._keys = array("q", compress(self._keys, self._live))  # type: ignore
+        self._values = array(  # type: ignore
+            self._value_type, compress(self._values, self._live)
+        )
+        self._live = bytearray(b"\x01") * len(self._keys)
+
+    def _insert_many(self, entries: Iterable[tuple[int, Hashable, Any]]) -> None:
+        for _, key, value in entries:
+            self[key] = value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if self._storage_refs[0] > 1:
+            self._detach()
+
+        hash_ = hash(key)
+        index = self._lookup(key, hash_)
+
+        if index != -1:
+            self._values[index] = value
+            return
+
+        # appending raises for non-numeric data, so do it before indexing
+        self._keys.append(key)  # type: ignore
+        try:
+            self._values.append(value)
+        except (TypeError, OverflowError):
+            self._keys.pop()
+            raise
+
+        self._insert_index(hash_, len(self._keys) - 1)
+        self._live.append(1)
+        self._used += 1
+        self._maybe_grow()
+
+    def __delitem__(self, key: Hashable) -> None:
+        if self._storage_refs[0] > 1:
+            self._detach()
+
+        index = self._delete_index(key, hash(key))
+
+        if index == -1:
+            raise KeyError(key)
+
+        self._live[index] = 0
+        self._used -= 1
+        self._maybe_shrink()
+
+    def update(self, other: object = None, /, **kwargs) -> None:
+        if other is None:
+            other = kwargs
+        elif kwargs:
+            raise ValueError()
+
+        if isinstance(other, dict):
+            items = other.items()
+        elif isinstance(other, HashTable):
+            items = other.iteritems()
+        else:
+            raise TypeError("incompatible object")
+
+        self._reserve(len(self) + len(other))
+        for key, value in items:
+            self[key] = value
+
+    def clear(self) -> None:
+        self._release_storage()
+        self._used = 0
+        self._keys = array("q")  # type: ignore
+        self._values = array(self._value_type)  # type: ignore
+        self._live = bytearray()
+        self._rebuild_index(self.capacity)
+
+    def iteritems(self):
+        return compress(zip(self._keys, self._values), self._live)
+
+    def iterkeys(self):
+        return compress(self._keys, self._live)
+
+    def itervalues(self):
+        return compress(self._values, self._live)
+
+
+def _has_value_hash(key: Hashable) -> bool:
+    if type(key) is tuple:
+        return all(map(_has_value_hash, key))  # type: ignore
+
+    return type(key) in _VALUE_HASHED_TYPES
+
+
+def _restore_hashtable(
+    table_class: type[HashTable],
+    args: tuple,
+    seed_probe: int,
+    hashes: array,
+    keys: list[Hashable],
+    values: list[Any],
+) -> HashTable:
+    """Rebuild a pickled or loaded table, reusing the stored hashes of keys
+    hashed by value when the hash seed matches and rehashing the others"""
+    if seed_probe == _HASH_SEED_PROBE:
+        stored = hashes.tolist()
+        hashes_ = [
+            stored_hash if _has_value_hash(key) else hash(key)
+            for stored_hash, key in zip(stored, keys)
+        ]
+    else:
+        hashes_ = list(map(hash, keys))
+
+    table = table_class(*args)
+    table._load_entries(hashes_, keys, values)  # type: ignore
+    return table
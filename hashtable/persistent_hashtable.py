@@ -0,0 +1,407 @@
+"""A hashtable stored in a memory-mapped file
+
+The file has a fixed little-endian layout::
+
+    header   magic, version, capacity, used, filled, data_end, live_bytes,
+             generation
+    index    ``capacity`` slots of (hash, offset), probed linearly
+    data     append-only records of (key length, value length, key, value)
+
+A slot offset of ``EMPTY`` means the slot was never used and ``DELETED``
+marks a tombstone; neither can be a real record offset because records
+always come after the header. ``live_bytes`` counts the records still
+in use, and ``generation`` goes up every time the file is compacted.
+Hashes come from BLAKE2b rather than ``hash()``, which is salted per
+process for ``str`` and ``bytes``.
+"""
+
+import mmap
+import os
+import struct
+from hashlib import blake2b
+from typing import Iterator
+
+from hashtable import LOAD_THRESHOLD, _round_up_to_power_of_two
+
+MAGIC = b"RPHT"
+VERSION = 2
+EMPTY = 0
+DELETED = 1
+
+HEADER = struct.Struct("<4sHxxQQQQQQ")
+HEADER_SIZE = 64
+SLOT = struct.Struct("<QQ")
+RECORD = struct.Struct("<II")
+
+
+def _to_bytes(data: bytes | str) -> bytes:
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data)
+    raise TypeError(f"keys and values should be bytes or str, not {type(data)}")
+
+
+def _stable_hash(key: bytes) -> int:
+    return int.from_bytes(blake2b(key, digest_size=8).digest(), "little")
+
+
+class PersistentHashTable:
+    """A file-backed hashtable of bytes that many processes can map at once
+
+    Like ``dbm``, keys and values are bytes, ``str`` is encoded as UTF-8,
+    and lookups return bytes. Opening a table only maps the file, so many
+    worker processes can share its pages through the OS page cache.
+
+    Writes append a new record and repoint the index slot, so readers
+    never see a half-written value. There should be a single writer at a
+    time. The file is compacted once stale records take more room than
+    live ones. Readers pick up appended records and compacted files on
+    their own.
+    """
+
+    def __init__(self, path: str | os.PathLike, writable: bool = False) -> None:
+        self._path = os.fspath(path)
+        self._writable = writable
+        self._map()
+
+    @classmethod
+    def create(cls, path: str | os.PathLike, capacity: int = 1024):
+        """Create an empty table file, replacing any existing one"""
+        if capacity <= 0:
+            raise ValueError("capacity should be positive integer")
+
+        capacity = _round_up_to_power_of_two(capacity)
+        data_start = HEADER_SIZE + capacity * SLOT.size
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, capacity, 0, 0, data_start, 0, 0))
+            file.truncate(data_start + capacity * 32)
+
+        return cls(path, writable=True)
+
+    def _map(self) -> None:
+        self._file = open(self._path, "r+b" if self._writable else "rb")
+        self._mm = mmap.mmap(
+            self._file.fileno(),
+            0,
+            access=mmap.ACCESS_WRITE if self._writable else mmap.ACCESS_READ,
+        )
+
+        magic, version, *_, generation = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self._path} is not a hashtable file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"unsupported hashtable file version: {version}")
+
+        self._generation = generation
+
+    def _unmap(self) -> None:
+        self._mm.close()
+        self._file.close()
+
+    def reload(self) -> None:
+        """Map the file again to see a compacted file or grown data"""
+        self._unmap()
+        self._map()
+
+    def close(self) -> None:
+        if self._writable and not self._mm.closed:
+            self._mm.flush()
+        self._unmap()
+
+    def flush(self) -> None:
+        self._mm.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _header(self) -> tuple[int, int, int, int, int]:
+        """Return the capacity, used and filled slots, data end and live bytes
+
+        A new generation means the writer has compacted the file into
+        another one, and data past the end of the mapping means it has
+        grown the file, so map it again in either case.
+        """
+        *_, generation = HEADER.unpack_from(self._mm)
+        if generation != self._generation:
+            self.reload()
+
+        _, _, capacity, used, filled, data_end, live, _ = HEADER.unpack_from(self._mm)
+        if data_end > len(self._mm):
+            self.reload()
+
+        return capacity, used, filled, data_end, live
+
+    def _write_header(
+        self, capacity: int, used: int, filled: int, data_end: int, live: int
+    ) -> None:
+        HEADER.pack_into(
+            self._mm,
+            0,
+            MAGIC,
+            VERSION,
+            capacity,
+            used,
+            filled,
+            data_end,
+            live,
+            self._generation,
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self._header()[0]
+
+    def __len__(self) -> int:
+        return self._header()[1]
+
+    @property
+    def load_factor(self) -> float:
+        return len(self) / self.capacity
+
+    def _record_size(self, offset: int) -> int:
+        key_length, value_length = RECORD.unpack_from(self._mm, offset)
+        return RECORD.size + key_length + value_length
+
+    def _record(self, offset: int) -> tuple[bytes, bytes]:
+        mm = self._mm
+        key_length, value_length = RECORD.unpack_from(mm, offset)
+        start = offset + RECORD.size
+        middle = start + key_length
+        return mm[start:middle], mm[middle : middle + value_length]
+
+    def _find_slot(self, key: bytes, hash_: int) -> tuple[int, int]:
+        """Return the position of the key's slot and its record offset
+
+        When the key is missing, return the first slot a new record could
+        take instead, together with an offset of ``EMPTY``.
+        """
+        capacity = self._header()[0]
+        mm, mask = self._mm, capacity - 1
+        slot, free_slot = hash_ & mask, -1
+
+        for _ in range(capacity):
+            position = HEADER_SIZE + slot * SLOT.size
+            slot_hash, offset = SLOT.unpack_from(mm, position)
+
+            if offset == EMPTY:
+                return (position if free_slot == -1 else free_slot), EMPTY
+
+            if offset == DELETED:
+                if free_slot == -1:
+                    free_slot = position
+            elif slot_hash == hash_ and self._record(offset)[0] == key:
+                return position, offset
+
+            slot = (slot + 1) & mask
+
+        return free_slot, EMPTY
+
+    def __getitem__(self, key: bytes | str) -> bytes:
+        key = _to_bytes(key)
+        _, offset = self._find_slot(key, _stable_hash(key))
+
+        if offset == EMPTY:
+            raise KeyError(key)
+
+        return self._record(offset)[1]
+
+    def __contains__(self, key: bytes | str) -> bool:
+        key = _to_bytes(key)
+        return self._find_slot(key, _stable_hash(key))[1] != EMPTY
+
+    def get(self, key: bytes | str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _ensure_writable(self) -> None:
+        if not self._writable:
+            raise PermissionError("hashtable file was opened read-only")
+
+    def _append_record(self, key: bytes, value: bytes, data_end: int) -> int:
+        record_end = data_end + RECORD.size + len(key) + len(value)
+
+        if record_end > len(self._mm):
+            self._mm.resize(max(record_end, 2 * len(self._mm)))
+
+        mm = self._mm
+        RECORD.pack_into(mm, data_end, len(key), len(value))
+        start = data_end + RECORD.size
+        mm[start : start + len(key)] = key
+        mm[start + len(key) : record_end] = value
+
+        return record_end
+
+    def __setitem__(self, key: bytes | str, value: bytes | str) -> None:
+        self._ensure_writable()
+        key, value = _to_bytes(key), _to_bytes(value)
+        hash_ = _stable_hash(key)
+
+        capacity, used, filled, data_end, live = self._header()
+        position, offset = self._find_slot(key, hash_)
+
+        if position == -1:
+            self.compact(capacity * 2)
+            self[key] = value
+            return
+
+        # the record is written before the slot points at it, so readers
+        # see either the old value or the new one
+        new_end = self._append_record(key, value, data_end)
+        previous_offset = SLOT.unpack_from(self._mm, position)[1]
+        SLOT.pack_into(self._mm, position, hash_, data_end)
+
+        if offset == EMPTY:
+            used += 1
+            if previous_offset == EMPTY:
+                filled += 1
+        else:
+            live -= self._record_size(offset)
+
+        live += new_end - data_end
+        self._write_header(capacity, used, filled, new_end, live)
+
+        if filled > capacity * LOAD_THRESHOLD:
+            self.compact(capacity * 2 if used > capacity * LOAD_THRESHOLD / 2 else None)
+        else:
+            self._maybe_compact()
+
+    def __delitem__(self, key: bytes | str) -> None:
+        self._ensure_writable()
+        key = _to_bytes(key)
+        hash_ = _stable_hash(key)
+        position, offset = self._find_slot(key, hash_)
+
+        if offset == EMPTY:
+            raise KeyError(key)
+
+        SLOT.pack_into(self._mm, position, hash_, DELETED)
+        capacity, used, filled, data_end, live = self._header()
+        live -= self._record_size(offset)
+        self._write_header(capacity, used - 1, filled, data_end, live)
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        """Compact once stale records outweigh live ones
+
+        Small tables are left alone until the stale records fill the room
+        that ``create`` reserved for data, so compactions stay rare.
+        """
+        capacity, _, _, data_end, live = self._header()
+        stale = data_end - HEADER_SIZE - capacity * SLOT.size - live
+
+        if stale > max(live, capacity * 32):
+            self.compact()
+
+    def iteritems(self) -> Iterator[tuple[bytes, bytes]]:
+        """Yield key-value pairs in index order"""
+        capacity = self.capacity
+
+        for position in range(
+            HEADER_SIZE, HEADER_SIZE + capacity * SLOT.size, SLOT.size
+        ):
+            _, offset = SLOT.unpack_from(self._mm, position)
+            if offset not in (EMPTY, DELETED):
+                yield self._record(offset)
+
+    def __iter__(self) -> Iterator[bytes]:
+        for key, _ in self.iteritems():
+            yield key
+
+    @property
+    def keys(self) -> list[bytes]:
+        return [key for key, _ in self.iteritems()]
+
+    @property
+    def values(self) -> list[bytes]:
+        return [value for _, value in self.iteritems()]
+
+    def update(self, other: object = None, /, **kwargs) -> None:
+        if other is None:
+            other = kwargs
+        elif kwargs:
+            raise ValueError()
+
+        if isinstance(other, dict):
+            items = other.items()
+        elif hasattr(other, "iteritems"):
+            items = other.iteritems()
+        else:
+            raise TypeError("incompatible object")
+
+        for key, value in items:
+            self[key] = value
+
+    def compact(self, capacity: int | None = None) -> None:
+        """Rewrite the file without stale records, optionally resizing it
+
+        The new file replaces the old one atomically, and the generation in
+        the old file's header is bumped afterwards, so readers keep a
+        consistent view of the old file until they next look at the header
+        and map the new one.
+        """
+        self._ensure_writable()
+        capacity = _round_up_to_power_of_two(capacity or self.capacity)
+
+        while len(self) > capacity * LOAD_THRESHOLD:
+            capacity *= 2
+        data_start = HEADER_SIZE + capacity * SLOT.size
+        index = bytearray(capacity * SLOT.size)
+        mask = capacity - 1
+
+        temporary_path = f"{self._path}.compact"
+        used = 0
+        generation = self._generation + 1
+        with open(temporary_path, "wb") as file:
+            file.seek(data_start)
+            data_end = data_start
+
+            for key, value in self.iteritems():
+                hash_ = _stable_hash(key)
+                slot = hash_ & mask
+                while SLOT.unpack_from(index, slot * SLOT.size)[1] != EMPTY:
+                    slot = (slot + 1) & mask
+                SLOT.pack_into(index, slot * SLOT.size, hash_, data_end)
+
+                file.write(RECORD.pack(len(key), len(value)) + key + value)
+                data_end += RECORD.size + len(key) + len(value)
+                used += 1
+
+            file.truncate(max(data_end, data_start + capacity * 32))
+            file.seek(0)
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    capacity,
+                    used,
+                    used,
+                    data_end,
+                    data_end - data_start,
+                    generation,
+                )
+            )
+            file.seek(HEADER_SIZE)
+            file.write(index)
+
+        os.replace(temporary_path, self._path)
+
+        # tell readers still mapping the old file to move on
+        self._generation = generation
+        capacity, used, filled, data_end, live = HEADER.unpack_from(self._mm)[2:7]
+        self._write_header(capacity, used, filled, data_end, live)
+
+        self._unmap()
+        self._map()
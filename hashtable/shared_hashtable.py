@@ -0,0 +1,393 @@
+"""A sharded hashtable of numbers in shared memory, readable from many processes
+
+The table is a small header segment listing the shards, followed by one
+``multiprocessing.shared_memory`` segment per shard with a fixed layout::
+
+    header   capacity, number of used slots, number of deleted slots
+    keys     ``capacity`` signed 64-bit integers
+    values   ``capacity`` numbers of the table's value type
+    states   ``capacity`` bytes: empty, used or deleted
+
+Keys go to a shard by the top bits of one multiplicative hash and to a
+slot by another, probing linearly. Integers hash the same in every
+process, so any process that attaches the segments can look keys up.
+"""
+
+import math
+import operator
+import weakref
+from array import array
+from multiprocessing import shared_memory
+from struct import Struct
+from typing import Iterable, Iterator
+
+from hashtable import (
+    FIBONACCI_MULTIPLIER,
+    HASH_MASK,
+    LOAD_THRESHOLD,
+    NUMERIC_TYPECODES,
+    PARTITION_MULTIPLIER,
+    _round_up_to_power_of_two,
+)
+
+MAGIC = b"RPSH"
+VERSION = 1
+SHARDS = 8
+EMPTY, USED, DELETED = 0, 1, 2
+
+TABLE_HEADER = Struct("<4sHcxI")
+SHARD_HEADER = Struct("<QQQ")
+
+KEY_MIN, KEY_MAX = -(2**63), 2**63 - 1
+
+
+def _shard_capacity(capacity: int, shards: int) -> int:
+    """Return the slots each shard needs for ``capacity`` keys in total
+
+    Keys do not spread over the shards evenly, so each one gets room for
+    four standard deviations more than its share, and a spare slot that
+    stays empty so that probing for missing keys stops.
+    """
+    share = capacity / shards
+    keys = share + 4 * math.sqrt(share)
+
+    return _round_up_to_power_of_two(math.ceil(keys / LOAD_THRESHOLD) + 1)
+
+
+def _check_key(key: object) -> int:
+    """Return the key as an integer that fits a signed 64-bit slot"""
+    key = operator.index(key)  # type: ignore
+
+    if not KEY_MIN <= key <= KEY_MAX:
+        raise OverflowError(f"key out of the signed 64-bit range: {key}")
+
+    return key
+
+
+def _shard_size(capacity: int, value_type: str) -> int:
+    return SHARD_HEADER.size + capacity * (8 + array(value_type).itemsize + 1)
+
+
+class _Shard:
+    """Typed views of one shard's shared memory segment"""
+
+    def __init__(self, memory: shared_memory.SharedMemory, value_type: str) -> None:
+        self.memory = memory
+        buffer = memory.buf
+        self.capacity = SHARD_HEADER.unpack_from(buffer)[0]
+        self.mask = self.capacity - 1
+        self.shift = 64 - (self.capacity.bit_length() - 1)
+
+        start = SHARD_HEADER.size
+        end = start + self.capacity * 8
+        self.keys = buffer[start:end].cast("q")
+
+        start, end = end, end + self.capacity * array(value_type).itemsize
+        self.values = buffer[start:end].cast(value_type)
+        self.states = buffer[end : end + self.capacity]
+
+    @property
+    def counts(self) -> tuple[int, int]:
+        return SHARD_HEADER.unpack_from(self.memory.buf)[1:]
+
+    def set_counts(self, used: int, deleted: int) -> None:
+        SHARD_HEADER.pack_into(self.memory.buf, 0, self.capacity, used, deleted)
+
+    def find_slot(self, key: int) -> int:
+        """Return the key's slot, or -1 when missing"""
+        keys, states, mask = self.keys, self.states, self.mask
+        slot = ((key * FIBONACCI_MULTIPLIER) & HASH_MASK) >> self.shift
+
+        for _ in range(self.capacity):
+            state = states[slot]
+
+            if state == EMPTY:
+                break
+
+            if state == USED and keys[slot] == key:
+                return slot
+
+            slot = (slot + 1) & mask
+
+        return -1
+
+    def release(self) -> None:
+        for view in (self.keys, self.values, self.states):
+            view.release()
+        self.memory.close()
+
+
+def _release(shards: list[_Shard], header: shared_memory.SharedMemory) -> None:
+    for shard in shards:
+        shard.release()
+    header.close()
+
+
+class SharedHashTable:
+    """A hashtable of integer keys and numbers that processes share in memory
+
+    Lookups read the shared buffers directly and take no locks, so worker
+    processes, for example those of a ``ProcessPoolExecutor``, can query
+    the same table in parallel. Pickling the table only sends the name of
+    its header segment, and unpickling attaches to the existing memory.
+
+    A value is written before its slot is marked as used, so readers never
+    see a half-inserted entry. Writes are not synchronised, though: only
+    one process should modify the table at a time. Shards have a fixed
+    capacity, chosen when the table is created, and inserting into a full
+    shard raises ``MemoryError``.
+
+    The process that created the table should ``unlink()`` it when done;
+    every process should ``close()`` its own handle.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        shards: int = SHARDS,
+        value_type: str = "d",
+        name: str | None = None,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity should be positive integer")
+
+        if shards <= 0 or shards & (shards - 1):
+            raise ValueError("shards should be a power of two")
+
+        if value_type not in NUMERIC_TYPECODES:
+            raise ValueError(f"unsupported value type: {value_type!r}")
+
+        shard_capacity = _shard_capacity(capacity, shards)
+
+        self._header = shared_memory.SharedMemory(
+            name, create=True, size=TABLE_HEADER.size
+        )
+        TABLE_HEADER.pack_into(
+            self._header.buf, 0, MAGIC, VERSION, value_type.encode(), shards
+        )
+
+        memories = []
+        for index in range(shards):
+            memory = shared_memory.SharedMemory(
+                f"{self._header.name}_{index}",
+                create=True,
+                size=_shard_size(shard_capacity, value_type),
+            )
+            SHARD_HEADER.pack_into(memory.buf, 0, shard_capacity, 0, 0)
+            memories.append(memory)
+
+        self._open(value_type, memories)
+
+    @classmethod
+    def attach(cls, name: str):
+        """Open a table that another process created"""
+        new = cls.__new__(cls)
+        new._header = shared_memory.SharedMemory(name)
+        magic, version, value_type, shards = TABLE_HEADER.unpack_from(new._header.buf)
+
+        if magic != MAGIC:
+            new._header.close()
+            raise ValueError(f"{name} is not a shared hashtable")
+        if version != VERSION:
+            new._header.close()
+            raise ValueError(f"unsupported shared hashtable version: {version}")
+
+        new._open(
+            value_type.decode(),
+            [shared_memory.SharedMemory(f"{name}_{index}") for index in range(shards)],
+        )
+        return new
+
+    def _open(self, value_type: str, memories: list) -> None:
+        self._value_type = value_type
+        self._shards = [_Shard(memory, value_type) for memory in memories]
+        self._shift = 64 - (len(memories).bit_length() - 1)
+        # worker processes rarely close their handles, so release the views
+        # on exit, before the segments try to close themselves
+        self._finalizer = weakref.finalize(self, _release, self._shards, self._header)
+
+    def __reduce__(self):
+        return self.__class__.attach, (self.name,)
+
+    def close(self) -> None:
+        """Detach this process from the shared memory"""
+        self._finalizer()
+
+    def unlink(self) -> None:
+        """Free the shared memory once every process has closed it"""
+        for shard in self._shards:
+            shard.memory.unlink()
+        self._header.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def name(self) -> str:
+        return self._header.name
+
+    @property
+    def value_type(self) -> str:
+        return self._value_type
+
+    @property
+    def shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def capacity(self) -> int:
+        return sum(shard.capacity for shard in self._shards)
+
+    def __len__(self) -> int:
+        return sum(shard.counts[0] for shard in self._shards)
+
+    def _shard(self, key: int) -> _Shard:
+        return self._shards[((key * PARTITION_MULTIPLIER) & HASH_MASK) >> self._shift]
+
+    def _locate(self, key: int) -> tuple[_Shard, int]:
+        """Return the key's shard and slot, with a slot of -1 when missing
+
+        Raise ``TypeError`` or ``OverflowError`` for keys that no slot
+        could hold.
+        """
+        key = _check_key(key)
+        shard = self._shard(key)
+        return shard, shard.find_slot(key)
+
+    def __getitem__(self, key: int):
+        try:
+            shard, slot = self._locate(key)
+        except (TypeError, OverflowError):
+            raise KeyError(key) from None
+
+        if slot == -1:
+            raise KeyError(key)
+
+        return shard.values[slot]
+
+    def __contains__(self, key: int) -> bool:
+        try:
+            return self._locate(key)[1] != -1
+        except (TypeError, OverflowError):
+            return False
+
+    def get(self, key: int, default=None):
+        try:
+            shard, slot = self._locate(key)
+        except (TypeError, OverflowError):
+            return default
+
+        return default if slot == -1 else shard.values[slot]
+
+    def get_many(self, keys: Iterable[int], default=None) -> list:
+        return [self.get(key, default) for key in keys]
+
+    def __setitem__(self, key: int, value) -> None:
+        key = _check_key(key)
+        shard = self._shard(key)
+        slot = shard.find_slot(key)
+
+        if slot != -1:
+            shard.values[slot] = value
+            return
+
+        # the key is missing, so it can take the first slot not in use
+        keys, states, mask = shard.keys, shard.states, shard.mask
+        slot = ((key * FIBONACCI_MULTIPLIER) & HASH_MASK) >> shard.shift
+        while states[slot] == USED:
+            slot = (slot + 1) & mask
+
+        used, deleted = shard.counts
+        if states[slot] == DELETED:
+            deleted -= 1
+        elif used + deleted + 1 >= shard.capacity:
+            # keep an empty slot so that probing for missing keys stops
+            if not deleted:
+                raise MemoryError("shard is full")
+            self._purge(shard)
+            self[key] = value
+            return
+
+        keys[slot] = key
+        shard.values[slot] = value
+        states[slot] = USED
+        shard.set_counts(used + 1, deleted)
+
+    def __delitem__(self, key: int) -> None:
+        try:
+            shard, slot = self._locate(key)
+        except (TypeError, OverflowError):
+            raise KeyError(key) from None
+
+        if slot == -1:
+            raise KeyError(key)
+
+        shard.states[slot] = DELETED
+        used, deleted = shard.counts
+        shard.set_counts(used - 1, deleted + 1)
+
+    def _purge(self, shard: _Shard) -> None:
+        """Reinsert a shard's entries in place to drop its tombstones
+
+        Readers can miss keys of this shard until the purge is over.
+        """
+        entries = [
+            (shard.keys[slot], shard.values[slot])
+            for slot in range(shard.capacity)
+            if shard.states[slot] == USED
+        ]
+        shard.states[:] = bytes(shard.capacity)
+        shard.set_counts(0, 0)
+
+        for key, value in entries:
+            self[key] = value
+
+    def iteritems(self) -> Iterator[tuple[int, int | float]]:
+        for shard in self._shards:
+            keys, values, states = shard.keys, shard.values, shard.states
+            for slot in range(shard.capacity):
+                if states[slot] == USED:
+                    yield keys[slot], values[slot]
+
+    def __iter__(self) -> Iterator[int]:
+        for key, _ in self.iteritems():
+            yield key
+
+    @property
+    def keys(self) -> list[int]:
+        return [key for key, _ in self.iteritems()]
+
+    @property
+    def values(self) -> list[int | float]:
+        return [value for _, value in self.iteritems()]
+
+    def update(self, other: object = None, /, **kwargs) -> None:
+        if other is None:
+            other = kwargs
+        elif kwargs:
+            raise ValueError()
+
+        if isinstance(other, dict):
+            items: Iterable = other.items()
+        elif hasattr(other, "iteritems"):
+            items = other.iteritems()
+        else:
+            raise TypeError("incompatible object")
+
+        for key, value in items:
+            self[key] = value
+
+    @classmethod
+    def from_dict(
+        cls,
+        source: dict,
+        shards: int = SHARDS,
+        value_type: str = "d",
+        name: str | None = None,
+    ):
+        new = cls(max(len(source), 1), shards, value_type, name)
+        new.update(source)
+        return new
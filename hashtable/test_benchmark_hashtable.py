@@ -0,0 +1,31 @@
+"""Smoke tests for benchmark_hashtable"""
+
+import pytest
+
+from benchmark_hashtable import OPERATIONS, TABLES, _make_keys, run
+
+
+@pytest.mark.parametrize("key_type", ("int", "str", "tuple", "collision"))
+def test_should_make_distinct_keys(key_type: str):
+    keys = _make_keys(key_type, 100)
+
+    assert len(set(keys)) == 100
+
+
+def test_should_report_every_table_operation_and_memory():
+    results = run(
+        sizes=[50],
+        key_types=["int", "str"],
+        tables=list(TABLES),
+        operations=list(OPERATIONS),
+        repeat=1,
+    )
+
+    int_tables = len(TABLES)
+    str_tables = len(TABLES) - 1
+    assert len(results) == (int_tables + str_tables) * (len(OPERATIONS) + 1)
+    assert all(result.measure > 0 for result in results)
+    assert all(result.ratio == 1 for result in results if result.table == "dict")
+    assert {result.unit for result in results if result.operation == "memory"} == {
+        "bytes/entry"
+    }
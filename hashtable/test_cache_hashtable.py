@@ -0,0 +1,194 @@
+"""Unit tests for cache_hashtable"""
+
+import pickle
+
+import pytest
+
+from cache_hashtable import CacheHashTable, CacheStats, memoize
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_should_evict_least_recently_used():
+    cache = CacheHashTable(max_size=3)
+    cache["a"], cache["b"], cache["c"] = 1, 2, 3
+
+    cache["a"]
+    cache["d"] = 4
+
+    assert "b" not in cache
+    assert cache.keys == ["c", "a", "d"]
+    assert cache.stats.evictions == 1
+
+
+def test_should_count_updates_as_use():
+    cache = CacheHashTable(max_size=2)
+    cache["a"], cache["b"] = 1, 2
+
+    cache["a"] = 10
+    cache["c"] = 3
+
+    assert cache == {"a": 10, "c": 3}
+
+
+def test_should_evict_least_frequently_used():
+    cache = CacheHashTable(max_size=3, policy="lfu")
+    cache["a"], cache["b"], cache["c"] = 1, 2, 3
+
+    for _ in range(3):
+        cache["a"]
+    cache["b"]
+    cache["d"] = 4
+
+    assert "c" not in cache
+    cache["e"] = 5
+
+    assert "d" not in cache
+    assert sorted(cache.keys) == ["a", "b", "e"]
+
+
+def test_should_limit_estimated_bytes():
+    cache = CacheHashTable(max_size=None, max_bytes=100, sizeof=lambda k, v: v)
+    cache["a"], cache["b"], cache["c"] = 40, 40, 10
+
+    cache["d"] = 30
+
+    assert cache == {"b": 40, "c": 10, "d": 30}
+    assert cache.stats.nbytes == 80
+
+    cache["c"] = 60
+
+    assert cache == {"c": 60, "d": 30}
+
+    cache["e"] = 101
+
+    assert "e" not in cache
+    assert cache.stats.nbytes == 90
+
+
+def test_should_expire_entries():
+    timer = FakeTimer()
+    cache = CacheHashTable(ttl=10, timer=timer)
+    cache["a"] = 1
+    cache.set("b", 2, ttl=100)
+
+    timer.now = 10
+
+    assert "a" not in cache
+    assert cache["b"] == 2
+
+    cache["c"] = 3
+    timer.now = 200
+
+    assert cache.expire() == 2
+    assert len(cache) == 0
+    assert cache.stats.expirations == 3
+
+
+def test_should_count_hits_and_misses():
+    cache = CacheHashTable()
+    cache["a"] = 1
+
+    cache["a"]
+    cache.get("a")
+    cache.get("missing")
+
+    with pytest.raises(KeyError):
+        cache["missing"]
+
+    assert cache.stats == CacheStats(2, 2, 0, 0, 1, 0)
+
+    cache.reset_stats()
+
+    assert cache.stats.hits == 0
+
+
+@pytest.mark.parametrize("policy", ["lru", "lfu"])
+def test_should_stay_consistent_under_churn(policy):
+    cache = CacheHashTable(max_size=50, policy=policy)
+    expected = {}
+
+    for i in range(5000):
+        key = i % 97
+        if key in cache:
+            assert cache[key] == expected[key]
+        cache[key] = i
+        expected[key] = i
+
+    assert len(cache) == 50
+    assert len(cache._keys) <= 2 * 50 + 1
+    assert all(cache[key] == expected[key] for key in cache.keys)
+
+
+def test_should_not_share_writes_with_copies():
+    cache = CacheHashTable(max_size=2, policy="lfu")
+    cache["a"], cache["b"] = 1, 2
+    snapshot = cache.copy()
+
+    cache["a"]
+    cache["c"] = 3
+
+    assert snapshot == {"a": 1, "b": 2}
+    assert cache == {"a": 1, "c": 3}
+
+
+def test_should_pickle_settings():
+    cache = CacheHashTable(max_size=2, policy="lfu")
+    cache["a"], cache["b"] = 1, 2
+
+    unpickled = pickle.loads(pickle.dumps(cache))
+
+    assert unpickled == cache
+    assert unpickled.max_size == 2
+    assert unpickled.policy == "lfu"
+
+
+def test_should_reject_invalid_settings():
+    with pytest.raises(ValueError):
+        CacheHashTable(max_size=0)
+
+    with pytest.raises(ValueError):
+        CacheHashTable(max_bytes=-1)
+
+    with pytest.raises(ValueError):
+        CacheHashTable(policy="fifo")
+
+    with pytest.raises(ValueError):
+        CacheHashTable(ttl=0)
+
+
+def test_should_memoize_function():
+    calls = []
+
+    @memoize(CacheHashTable(max_size=2))
+    def square(number, offset=0):
+        calls.append(number)
+        return number**2 + offset
+
+    assert square(2) == 4
+    assert square(2) == 4
+    assert square(2, offset=1) == 5
+    assert square(3) == 9
+    assert square(2) == 4
+    assert calls == [2, 2, 3, 2]
+    assert square.cache.stats.hits == 1
+    assert square.__name__ == "square"
+
+
+def test_should_memoize_none_results():
+    calls = []
+
+    @memoize()
+    def nothing():
+        calls.append(None)
+
+    nothing()
+    nothing()
+
+    assert len(calls) == 1
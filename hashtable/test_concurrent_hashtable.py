@@ -0,0 +1,135 @@
+"""Unit tests for concurrent_hashtable"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+
+from concurrent_hashtable import ConcurrentHashTable
+from hashtable import HashTable, OpenAddressingHashTable
+
+
+@pytest.fixture
+def table():
+    sample = ConcurrentHashTable(capacity=64, segments=4)
+    sample["hola"] = "hello"
+    sample[98.6] = 37
+    sample[False] = True
+
+    return sample
+
+
+def test_should_behave_like_a_hashtable(table: ConcurrentHashTable):
+    assert len(table) == 3
+    assert table["hola"] == "hello"
+    assert table.get("missing", "default") == "default"
+    assert 98.6 in table
+
+    del table[98.6]
+
+    assert 98.6 not in table
+    assert table == {"hola": "hello", False: True}
+    assert eval(repr(table)) == table
+
+    with pytest.raises(KeyError):
+        table["missing"]
+
+
+def test_should_reject_invalid_segments():
+    with pytest.raises(ValueError):
+        ConcurrentHashTable(segments=3)
+
+    with pytest.raises(ValueError):
+        ConcurrentHashTable(capacity=0)
+
+
+def test_should_spread_keys_over_segments():
+    table = ConcurrentHashTable(segments=8)
+    table.update({i: i for i in range(800)})
+
+    sizes = [len(segment) for segment in table._segments]
+
+    assert sum(sizes) == len(table) == 800
+    assert min(sizes) > 50
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_use_custom_segment_class(table_class):
+    table = ConcurrentHashTable(segments=2, table_class=table_class)
+    table.update(a=1, b=2)
+    new = table.copy()
+    table.clear()
+
+    assert all(isinstance(segment, table_class) for segment in new._segments)
+    assert new == {"a": 1, "b": 2}
+    assert len(table) == 0
+
+
+def test_should_insert_from_many_threads():
+    table = ConcurrentHashTable(segments=4)
+
+    def insert(start: int) -> None:
+        for i in range(start, start + 1000):
+            table[i] = i
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(insert, range(0, 8000, 1000)))
+
+    assert len(table) == 8000
+    assert all(table[i] == i for i in range(8000))
+
+
+def test_should_compute_each_missing_value_once():
+    table = ConcurrentHashTable(segments=4)
+    calls = []
+    barrier = Barrier(8)
+
+    def factory(key):
+        calls.append(key)
+        return key * 2
+
+    def worker(_) -> list:
+        barrier.wait()
+        return [table.compute_if_absent(key, factory) for key in range(200)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(worker, range(8)))
+
+    assert sorted(calls) == list(range(200))
+    assert all(result == [key * 2 for key in range(200)] for result in results)
+
+
+def test_should_pop_each_key_once():
+    table = ConcurrentHashTable.from_dict({i: i for i in range(1000)})
+    barrier = Barrier(4)
+
+    def worker(_) -> list:
+        barrier.wait()
+        return [table.pop(key, -1) for key in range(1000)]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        popped = [
+            value for result in executor.map(worker, range(4)) for value in result
+        ]
+
+    assert sorted(value for value in popped if value != -1) == list(range(1000))
+    assert len(table) == 0
+
+
+def test_should_setdefault_atomically():
+    table = ConcurrentHashTable()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        winners = set(executor.map(lambda n: table.setdefault("key", n), range(100)))
+
+    assert len(winners) == 1
+    assert table["key"] in winners
+
+
+def test_should_not_correlate_segments_with_buckets():
+    table = ConcurrentHashTable(segments=8)
+    table.update({i: i for i in range(8000)})
+
+    assert all(
+        segment.probe_stats().mean_probe_length < 2 for segment in table._segments
+    )
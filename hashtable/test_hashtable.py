@@ -1,9 +1,20 @@
 """Unit tests for hashtable"""
 
+import io
+import pickle
+import random
+
 import pytest
 
-from collections import deque
-from hashtable import HashTable
+import hashtable
+from hashtable import (
+    DUMMY_STATE,
+    HashTable,
+    IntHashTable,
+    OpenAddressingHashTable,
+    RobinHoodHashTable,
+    _HashTableView,
+)
 
 
 @pytest.fixture
@@ -40,7 +51,7 @@ def test_should_report_length(hash_table: HashTable):
 
 @pytest.mark.parametrize("num", (5, 10))
 def test_should_create_empty_pair_slots(num: int):
-    assert HashTable(capacity=num)._buckets == [deque()] * num
+    assert HashTable(capacity=num)._buckets == [None] * num
 
 
 def test_should_insert_key_value_pairs(hash_table: HashTable):
@@ -206,6 +217,47 @@ def test_should_convert_to_dict(hash_table: HashTable):
     assert list(dic.values()) == hash_table.values
 
 
+def test_views_should_reflect_later_changes(hash_table: HashTable):
+    keys, values, pairs = hash_table.keys, hash_table.values, hash_table.pairs
+
+    hash_table["year"] = 2022
+    del hash_table["hola"]
+
+    assert len(keys) == len(values) == len(pairs) == 3
+    assert "year" in keys
+    assert "hola" not in keys
+    assert 2022 in values
+    assert ("year", 2022) in pairs
+    assert ("year", 2021) not in pairs
+
+
+def test_should_not_create_view_without_iteration(hash_table: HashTable):
+    with pytest.raises(TypeError):
+        _HashTableView(hash_table)  # type: ignore
+
+
+def test_views_should_not_look_up_keys_when_iterating():
+    class Key:
+        hash_calls = 0
+
+        def __init__(self, number: int) -> None:
+            self.number = number
+
+        def __hash__(self) -> int:
+            Key.hash_calls += 1
+            return self.number
+
+    table = HashTable(capacity=8)
+    for i in range(5):
+        table[Key(i)] = i
+
+    Key.hash_calls = 0
+
+    assert sorted(table.values) == [0, 1, 2, 3, 4]
+    assert len(list(table.pairs)) == len(table) == 5
+    assert Key.hash_calls == 0
+
+
 def test_should_not_create_hashtable_with_zero_capacity():
     with pytest.raises(ValueError):
         HashTable(capacity=0)
@@ -259,6 +311,13 @@ def test_should_create_hashtable_from_dict():
     assert sorted(table.values, key=hash) == sorted(dictionary.values(), key=hash)
 
 
+def test_should_create_hashtable_from_empty_dict():
+    table = HashTable.from_dict({})
+
+    assert table.capacity == 1
+    assert len(table) == 0
+
+
 def test_should_create_hashtable_from_dict_with_custom_capacity():
     dictionary = {"hola": "hello", 98.6: 37, False: True}
 
@@ -445,10 +504,6 @@ def test_should_raise_keyerror_deleting_key():
         del table[9]
 
 
-@pytest.mark.skipif(
-    not hasattr(HashTable, "_resize_and_rehash"),
-    reason="Testable only when resizing is implemented",
-)
 def test_should_resize_up():
     table = HashTable(capacity=16)
 
@@ -461,41 +516,54 @@ def test_should_resize_up():
     table[16] = 16
 
     assert len(table) == 17
-    assert table.capacity == 18
+    assert table.capacity == 32
     for i in range(17):
         assert table[i] == i
 
-    table[17] = 17
 
-    assert len(table) == 18
-    assert table.capacity == 18
-    for i in range(18):
-        assert table[i] == i
+def test_should_resize_up_geometrically():
+    table = HashTable(capacity=8)
+    capacities = set()
+
+    for i in range(10_000):
+        table[i] = i
+        capacities.add(table.capacity)
+
+    assert len(capacities) == 12
+    assert table.capacity == 16384
+    assert all(table[i] == i for i in range(10_000))
 
 
-@pytest.mark.skipif(
-    not hasattr(HashTable, "_resize_and_rehash"),
-    reason="Testable only when resizing is implemented",
-)
 def test_should_resize_down():
-    table = HashTable(capacity=16)
+    table = HashTable(capacity=8)
 
-    for i in range(16):
+    for i in range(64):
         table[i] = i
 
-    for i in range(9):
+    assert table.capacity == 64
+
+    for i in range(49):
         del table[i]
 
-    assert len(table) == 7
-    assert table.capacity == 8
-    for i in range(9, 16):
+    assert len(table) == 15
+    assert table.capacity == 32
+    for i in range(49, 64):
         assert table[i] == i
 
 
-@pytest.mark.skipif(
-    not hasattr(HashTable, "_resize_and_rehash"),
-    reason="Testable only when resizing is implemented",
-)
+def test_should_not_resize_below_initial_capacity():
+    table = HashTable(capacity=8)
+
+    for i in range(64):
+        table[i] = i
+
+    for i in range(64):
+        del table[i]
+
+    assert len(table) == 0
+    assert table.capacity == 8
+
+
 def test_should_not_resize_under_certain_condition():
     table = HashTable(capacity=8)
 
@@ -524,3 +592,797 @@ def test_should_not_resize_under_certain_condition():
 
     assert len(table) == 3
     assert table.capacity == 8
+
+
+def test_should_respect_custom_load_threshold():
+    table = HashTable(capacity=8, load_threshold=0.5)
+
+    for i in range(4):
+        table[i] = i
+
+    assert table.capacity == 8
+
+    table[4] = 4
+
+    assert table.capacity == 16
+    assert table.load_threshold == 0.5
+
+
+@pytest.mark.parametrize("load_threshold", (0, -0.5))
+def test_should_reject_non_positive_load_threshold(load_threshold):
+    with pytest.raises(ValueError):
+        HashTable(capacity=8, load_threshold=load_threshold)
+
+
+@pytest.fixture(params=("linear", "quadratic"))
+def open_table(request):
+    sample = OpenAddressingHashTable(capacity=100, probing=request.param)
+    sample["hola"] = "hello"
+    sample[98.6] = 37
+    sample[False] = True
+
+    return sample
+
+
+def test_open_addressing_should_round_capacity_to_power_of_two():
+    assert OpenAddressingHashTable(capacity=100).capacity == 128
+    assert OpenAddressingHashTable(capacity=8).capacity == 8
+
+
+def test_open_addressing_should_reject_unknown_probing():
+    with pytest.raises(ValueError):
+        OpenAddressingHashTable(capacity=8, probing="cuckoo")
+
+
+def test_open_addressing_should_find_update_and_delete(open_table):
+    assert open_table["hola"] == "hello"
+    assert open_table[98.6] == 37
+    assert open_table[False] is True
+
+    open_table["hola"] = "hallo"
+    del open_table[98.6]
+
+    assert open_table["hola"] == "hallo"
+    assert 98.6 not in open_table
+    assert len(open_table) == 2
+    assert open_table == {"hola": "hallo", False: True}
+
+    with pytest.raises(KeyError):
+        del open_table[98.6]
+
+
+@pytest.mark.parametrize("probing", ("linear", "quadratic"))
+def test_open_addressing_should_probe_past_collisions(probing):
+    table = OpenAddressingHashTable(capacity=8, probing=probing)
+
+    for key in (1, 9, 17, 25):
+        table[key] = key
+
+    del table[9]
+
+    assert table[1] == 1
+    assert table[17] == 17
+    assert table[25] == 25
+    assert 9 not in table
+
+
+@pytest.mark.parametrize("probing", ("linear", "quadratic"))
+def test_open_addressing_should_reuse_deleted_slots(probing):
+    table = OpenAddressingHashTable(capacity=8, probing=probing)
+
+    for i in range(5):
+        table[i] = i
+
+    del table[3]
+    table[11] = 11
+
+    assert table.capacity == 8
+
+    assert table[11] == 11
+    assert list(table) == [0, 1, 2, 4, 11]
+
+
+def test_open_addressing_should_compare_keys_not_only_hashes():
+    table = OpenAddressingHashTable(capacity=8)
+    table[-1] = "minus one"
+
+    assert -2 not in table
+    assert hash(-1) == hash(-2)
+
+
+def test_open_addressing_should_copy_with_probing(open_table):
+    new = open_table.copy()
+
+    assert new is not open_table
+    assert new == open_table
+    assert new.probing == open_table.probing
+    assert new.capacity == open_table.capacity
+
+
+@pytest.mark.parametrize("probing", ("linear", "quadratic"))
+def test_open_addressing_should_grow_past_load_threshold(probing):
+    table = OpenAddressingHashTable(capacity=8, probing=probing)
+
+    for i in range(5):
+        table[i] = i
+
+    assert table.capacity == 8
+
+    table[5] = 5
+
+    assert table.capacity == 16
+    assert all(table[i] == i for i in range(6))
+
+
+def test_open_addressing_should_purge_tombstones_without_growing():
+    table = OpenAddressingHashTable(capacity=8)
+
+    for i in range(100):
+        table[i] = i
+        del table[i]
+
+    table["key"] = "value"
+
+    assert table.capacity == 8
+    assert table["key"] == "value"
+    assert len(table) == 1
+
+
+def test_open_addressing_should_shrink_after_mass_deletes():
+    table = OpenAddressingHashTable(capacity=8)
+
+    for i in range(1000):
+        table[i] = i
+
+    assert table.capacity == 2048
+
+    for i in range(990):
+        del table[i]
+
+    assert table.capacity < 2048
+    assert all(table[i] == i for i in range(990, 1000))
+
+
+@pytest.mark.parametrize("load_threshold", (0, 1, 1.5))
+def test_open_addressing_should_reject_invalid_load_threshold(load_threshold):
+    with pytest.raises(ValueError):
+        OpenAddressingHashTable(capacity=8, load_threshold=load_threshold)
+
+
+class CountingKey:
+    """A key that counts calls to __hash__ and collides on purpose"""
+
+    hash_calls = 0
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __hash__(self) -> int:
+        CountingKey.hash_calls += 1
+        return 42
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CountingKey) and self.name == other.name
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_tell_apart_keys_with_equal_hashes(table_class):
+    table = table_class(capacity=8)
+    table[CountingKey("a")] = 1
+    table[CountingKey("b")] = 2
+
+    assert len(table) == 2
+    assert table[CountingKey("a")] == 1
+    assert table[CountingKey("b")] == 2
+
+    del table[CountingKey("a")]
+
+    assert CountingKey("a") not in table
+    assert table[CountingKey("b")] == 2
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_hash_each_key_once_per_operation(table_class):
+    table = table_class(capacity=8)
+    keys = [CountingKey(str(i)) for i in range(4)]
+
+    for key in keys:
+        table[key] = key.name
+
+    CountingKey.hash_calls = 0
+    table[keys[2]]
+    table[keys[3]] = "updated"
+    del table[keys[0]]
+
+    assert CountingKey.hash_calls == 3
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_not_rehash_keys_when_resizing(table_class):
+    table = table_class(capacity=8)
+    keys = [CountingKey(str(i)) for i in range(5)]
+
+    for key in keys:
+        table[key] = key.name
+
+    CountingKey.hash_calls = 0
+    table._resize_and_rehash(table.capacity * 4)
+
+    assert CountingKey.hash_calls == 0
+    assert all(table[key] == key.name for key in keys)
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_keep_insertion_order_after_deletes(table_class):
+    table = table_class(capacity=8)
+
+    for i in range(20):
+        table[i] = str(i)
+
+    for i in range(0, 20, 3):
+        del table[i]
+
+    table[0] = "0"
+    expected = [i for i in range(20) if i % 3] + [0]
+
+    assert list(table) == expected
+    assert list(table.keys) == expected
+    assert list(table.values) == [str(i) for i in expected]
+    assert list(table.pairs) == [(i, str(i)) for i in expected]
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_compact_holes_left_by_deletes(table_class):
+    table = table_class(capacity=2048)
+
+    for i in range(1000):
+        table[i] = i
+
+    for i in range(0, 1000, 2):
+        del table[i]
+        assert len(table._hashes) <= 2 * len(table) + 1
+
+    assert table.capacity == 2048
+    assert list(table) == list(range(1, 1000, 2))
+    assert all(table[i] == i for i in range(1, 1000, 2))
+
+
+@pytest.mark.parametrize(
+    "table_class",
+    (HashTable, OpenAddressingHashTable, RobinHoodHashTable, IntHashTable),
+)
+def test_should_compact_without_rebuilding_index(table_class, monkeypatch):
+    table = table_class(capacity=2**16)
+
+    for i in range(20):
+        table[i * 7919] = i
+
+    def fail(capacity):
+        raise AssertionError("the index should not be rebuilt")
+
+    monkeypatch.setattr(table, "_rebuild_index", fail)
+
+    for i in range(0, 20, 2):
+        del table[i * 7919]
+
+    assert len(table._keys) <= 2 * len(table) + 1
+    assert list(table) == [i * 7919 for i in range(1, 20, 2)]
+    assert all(table[i * 7919] == i for i in range(1, 20, 2))
+
+    for i in range(1, 20, 2):
+        del table[i * 7919]
+
+    assert len(table) == 0
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_create_hashtable_from_pairs(table_class):
+    table = table_class.from_pairs(
+        ((key, key * 2) for key in (1, 2, 3, 2)), size_hint=4
+    )
+
+    assert len(table) == 3
+    assert list(table.pairs) == [(1, 2), (2, 4), (3, 6)]
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_let_later_duplicates_win_in_from_pairs(table_class):
+    table = table_class.from_pairs([("a", 1), ("b", 2), ("a", 3)])
+
+    assert table == {"a": 3, "b": 2}
+    assert list(table) == ["a", "b"]
+
+
+def test_should_create_empty_hashtable_from_no_pairs():
+    assert len(HashTable.from_pairs(iter(()))) == 0
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_presize_once_when_bulk_loading(table_class, monkeypatch):
+    resizes = []
+    original = table_class._resize_and_rehash
+
+    def spy(self, new_capacity):
+        resizes.append(new_capacity)
+        original(self, new_capacity)
+
+    monkeypatch.setattr(table_class, "_resize_and_rehash", spy)
+
+    table_class.from_pairs(((i, i) for i in range(1000)), size_hint=1000)
+    assert len(resizes) <= 1
+
+    resizes.clear()
+    table = table_class.from_dict({i: i for i in range(1000)}, capacity=8)
+    assert len(resizes) == 1
+
+    resizes.clear()
+    table.update({i: i for i in range(1000, 3000)})
+    assert len(resizes) == 1
+
+    assert len(table) == 3000
+    assert all(table[i] == i for i in range(3000))
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_reuse_cached_hashes_when_copying(table_class):
+    keys = [CountingKey(str(i)) for i in range(10)]
+    table = table_class.from_dict({key: key.name for key in keys})
+
+    CountingKey.hash_calls = 0
+    new = table.copy()
+    new.update(table)
+
+    assert CountingKey.hash_calls == 0
+    assert new == table
+
+
+def test_int_hashtable_should_store_numbers():
+    table = IntHashTable(capacity=8)
+
+    for i in range(-50, 50):
+        table[i * 7] = i / 2
+
+    del table[0]
+
+    assert len(table) == 99
+    assert table[-350] == -25.0
+    assert table[343] == 24.5
+    assert 0 not in table
+    assert list(table)[:3] == [-350, -343, -336]
+
+
+def test_int_hashtable_should_support_integer_values():
+    counters = IntHashTable(value_type="q")
+    counters.update({1: 10, 2: 20})
+    counters[1] += 1
+
+    assert counters == {1: 11, 2: 20}
+    assert counters.value_type == "q"
+
+
+def test_int_hashtable_should_reject_unsupported_value_type():
+    with pytest.raises(ValueError):
+        IntHashTable(value_type="u")
+
+
+def test_int_hashtable_should_reject_non_numeric_data():
+    table = IntHashTable(capacity=8)
+    table[1] = 1.0
+
+    with pytest.raises(TypeError):
+        table["key"] = 2.0
+
+    with pytest.raises(TypeError):
+        table[2] = "value"
+
+    assert len(table) == 1
+    assert table == {1: 1.0}
+
+
+def test_int_hashtable_should_copy_buffers():
+    table = IntHashTable.from_pairs((i, float(i)) for i in range(100))
+    new = table.copy()
+    new[0] = -1.0
+
+    assert table[0] == 0.0
+    assert new == {**{i: float(i) for i in range(1, 100)}, 0: -1.0}
+
+
+def test_int_hashtable_should_feed_other_hashtables():
+    table = IntHashTable.from_dict({1: 1.5, 2: 2.5})
+    generic = HashTable.from_dict({3: 3.5})
+
+    generic.update(table)
+
+    assert generic == {1: 1.5, 2: 2.5, 3: 3.5}
+    assert HashTable.from_dict({}, capacity=8).copy() == {}
+    assert OpenAddressingHashTable(capacity=8).copy() == {}
+
+
+def test_int_hashtable_should_use_little_memory_per_entry():
+    table = IntHashTable()
+
+    for i in range(10_000):
+        table[i] = float(i)
+
+    assert table.nbytes / len(table) < 32
+
+
+ALL_TABLE_CLASSES = (
+    HashTable,
+    OpenAddressingHashTable,
+    IntHashTable,
+    RobinHoodHashTable,
+)
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_get_many_values(table_class):
+    table = table_class.from_dict({1: 1.5, 2: 2.5, 3: 3.5})
+
+    assert table.get_many([3, 1, 4]) == [3.5, 1.5, None]
+    assert table.get_many(iter([2, 5]), default=0.0) == [2.5, 0.0]
+    assert table.get_many([]) == []
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_check_many_keys(table_class):
+    table = table_class.from_dict({1: 1.5, 2: 2.5})
+
+    assert table.contains_many(range(4)) == [False, True, True, False]
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_set_many_values(table_class):
+    table = table_class.from_dict({1: 1.5})
+
+    table.set_many(range(1000), (i / 2 for i in range(1000)))
+
+    assert len(table) == 1000
+    assert table.get_many([1, 999]) == [0.5, 499.5]
+    assert list(table)[:3] == [1, 0, 2]
+
+
+def test_should_reject_mismatched_set_many():
+    table = HashTable(capacity=8)
+
+    with pytest.raises(ValueError):
+        table.set_many(["a", "b"], [1])
+
+    assert len(table) == 0
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_copy_should_share_storage_until_written(table_class):
+    table = table_class.from_dict({i: float(i) for i in range(100)})
+
+    snapshot = table.copy()
+
+    assert snapshot._keys is table._keys
+    assert snapshot._values is table._values
+
+    table[0] = -1.0
+    del table[1]
+    table[100] = 100.0
+
+    assert snapshot._keys is not table._keys
+    assert snapshot == {i: float(i) for i in range(100)}
+    assert table[0] == -1.0
+    assert 1 not in table
+    assert len(table) == 100
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_copy_should_not_see_writes_to_snapshot(table_class):
+    table = table_class.from_dict({1: 1.0, 2: 2.0})
+    first = table.copy()
+    second = first.copy()
+
+    second[3] = 3.0
+    first.clear()
+
+    assert table == {1: 1.0, 2: 2.0}
+    assert first == {}
+    assert second == {1: 1.0, 2: 2.0, 3: 3.0}
+
+    table.set_many([4], [4.0])
+
+    assert table == {1: 1.0, 2: 2.0, 4: 4.0}
+    assert second == {1: 1.0, 2: 2.0, 3: 3.0}
+
+
+def test_copy_should_not_copy_storage_once_unshared():
+    table = HashTable.from_dict({"a": 1})
+    table.copy().clear()
+
+    keys = table._keys
+    table["b"] = 2
+
+    assert table._keys is keys
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_dump_and_load(table_class, compressed):
+    table = table_class.from_dict({i: float(i) for i in range(100)})
+    del table[50]
+    buffer = io.BytesIO()
+
+    table.dump(buffer, compressed=compressed)
+    buffer.seek(0)
+    loaded = table_class.load(buffer)
+
+    assert type(loaded) is table_class
+    assert loaded == table
+    assert loaded.capacity == table.capacity
+    assert loaded.keys == table.keys
+
+
+def test_should_compress_dump():
+    table = HashTable.from_dict({i: "value" for i in range(1000)})
+    plain, packed = io.BytesIO(), io.BytesIO()
+
+    table.dump(plain)
+    table.dump(packed, compressed=True)
+
+    assert len(packed.getvalue()) < len(plain.getvalue())
+
+
+def test_should_keep_table_settings_when_loading():
+    table = OpenAddressingHashTable(64, "quadratic", load_threshold=0.5)
+    table["hola"] = "hello"
+    buffer = io.BytesIO()
+
+    table.dump(buffer)
+    buffer.seek(0)
+    loaded = HashTable.load(buffer)
+
+    assert isinstance(loaded, OpenAddressingHashTable)
+    assert loaded.probing == "quadratic"
+    assert loaded.load_threshold == 0.5
+    assert loaded.capacity == 64
+
+
+def test_should_not_rehash_keys_when_loading(monkeypatch):
+    table = HashTable.from_pairs(
+        ((name, (name, i), name.encode()), name) for i, name in enumerate("abc")
+    )
+    buffer = io.BytesIO()
+    table.dump(buffer)
+    buffer.seek(0)
+
+    hash_calls = []
+    monkeypatch.setattr(
+        hashtable, "hash", lambda key: hash_calls.append(key), raising=False
+    )
+    loaded = HashTable.load(buffer)
+
+    assert hash_calls == []
+    assert loaded.values == ["a", "b", "c"]
+
+
+def test_should_rehash_keys_hashed_by_identity_when_loading():
+    table = HashTable.from_pairs((CountingKey(name), name) for name in "abc")
+    buffer = io.BytesIO()
+    table.dump(buffer)
+    buffer.seek(0)
+
+    CountingKey.hash_calls = 0
+    loaded = HashTable.load(buffer)
+
+    assert CountingKey.hash_calls == 3
+    assert loaded[CountingKey("b")] == "b"
+
+
+def test_should_reject_invalid_dump():
+    with pytest.raises(ValueError):
+        HashTable.load(io.BytesIO(b"garbage"))
+
+    with pytest.raises(ValueError):
+        HashTable.load(io.BytesIO(b"XXXX" + bytes(20)))
+
+
+def test_should_reject_loading_into_unrelated_class():
+    buffer = io.BytesIO()
+    HashTable.from_dict({"a": 1}).dump(buffer)
+    buffer.seek(0)
+
+    with pytest.raises(TypeError):
+        IntHashTable.load(buffer)
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_pickle(table_class):
+    table = table_class.from_dict({i: float(i) for i in range(100)})
+
+    unpickled = pickle.loads(pickle.dumps(table))
+
+    assert type(unpickled) is table_class
+    assert unpickled == table
+    unpickled[100] = 100.0
+    assert 100 not in table
+
+
+@pytest.mark.parametrize("table_class", (HashTable, OpenAddressingHashTable))
+def test_should_find_keys_hashed_by_identity_after_pickling(table_class):
+    keys = [object(), object(), float("nan"), (1, object())]
+    table = table_class.from_pairs((key, i) for i, key in enumerate(keys))
+
+    unpickled = pickle.loads(pickle.dumps(table))
+    buffer = io.BytesIO()
+    table.dump(buffer)
+    buffer.seek(0)
+    loaded = table_class.load(buffer)
+
+    for restored in (unpickled, loaded):
+        assert len(restored) == 4
+        assert all(key in restored for key in restored)
+        assert [restored[key] for key in restored] == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_spread_keys_with_common_stride(table_class):
+    table = table_class(capacity=1024)
+    table.update({i << 32: 1.0 for i in range(500)})
+
+    stats = table.probe_stats()
+
+    assert stats.max_probe_length < 10
+    assert stats.mean_probe_length < 2
+
+
+def test_should_report_probe_stats_for_chains():
+    table = HashTable.from_pairs((CountingKey(name), name) for name in "abc")
+
+    stats = table.probe_stats()
+
+    assert stats.histogram == {1: 1, 2: 1, 3: 1}
+    assert stats.max_probe_length == 3
+    assert stats.mean_probe_length == 2
+    assert stats.collision_rate == pytest.approx(2 / 3)
+
+
+@pytest.mark.parametrize("probing", ("linear", "quadratic"))
+def test_should_report_probe_stats_for_open_addressing(probing):
+    table = OpenAddressingHashTable(capacity=16, probing=probing)
+    for name in "abcd":
+        table[CountingKey(name)] = name
+
+    stats = table.probe_stats()
+
+    assert sum(stats.histogram.values()) == 4
+    assert stats.max_probe_length == 4
+    assert stats.collision_rate == 0.75
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_report_empty_probe_stats(table_class):
+    stats = table_class().probe_stats()
+
+    assert stats.histogram == {}
+    assert stats.max_probe_length == 0
+
+
+def test_robin_hood_should_find_update_and_delete():
+    table = RobinHoodHashTable()
+    expected = {}
+
+    for i in range(2000):
+        table[i * 7] = i
+        expected[i * 7] = i
+        if i % 3 == 0:
+            del table[i // 2 * 7]
+            del expected[i // 2 * 7]
+
+    assert table == expected
+    assert all(table[key] == value for key, value in expected.items())
+
+
+def test_robin_hood_should_handle_colliding_hashes():
+    table = RobinHoodHashTable(capacity=16)
+    keys = [CountingKey(name) for name in "abcdef"]
+    for key in keys:
+        table[key] = key.name
+
+    del table[keys[1]]
+    del table[keys[4]]
+
+    assert [table[key] for key in keys if key in table] == ["a", "c", "d", "f"]
+    assert CountingKey("b") not in table
+
+
+def test_robin_hood_should_not_leave_tombstones():
+    table = RobinHoodHashTable(capacity=1024)
+
+    for i in range(900):
+        table[f"key{i}"] = i
+    for i in range(0, 900, 2):
+        del table[f"key{i}"]
+
+    assert DUMMY_STATE not in table._indices
+    assert table._filled == len(table) == 450
+
+
+def test_robin_hood_should_keep_probes_even_at_high_load():
+    keys = random.Random(0).sample(range(2**62), int(4096 * 0.9))
+    robin_hood = RobinHoodHashTable(capacity=4096)
+    linear = OpenAddressingHashTable(capacity=4096, load_threshold=0.95)
+
+    for table in (robin_hood, linear):
+        table.set_many(keys, [1] * len(keys))
+
+    assert robin_hood.capacity == linear.capacity == 4096
+    assert robin_hood.probe_stats().max_probe_length < 40
+    assert linear.probe_stats().max_probe_length > 100
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_combine_keys_with_set_operators(table_class):
+    left = table_class.from_dict({1: 1.0, 2: 2.0, 3: 3.0})
+    right = table_class.from_dict({3: 30.0, 4: 40.0})
+
+    assert left | right == {1: 1.0, 2: 2.0, 3: 30.0, 4: 40.0}
+    assert left & right == {3: 3.0}
+    assert left - right == {1: 1.0, 2: 2.0}
+    assert left ^ right == {1: 1.0, 2: 2.0, 4: 40.0}
+    assert type(left & right) is table_class
+    assert left == {1: 1.0, 2: 2.0, 3: 3.0}
+
+
+def test_should_combine_keys_with_dict():
+    table = HashTable.from_dict({"a": 1, "b": 2})
+
+    assert table | {"c": 3} == {"a": 1, "b": 2, "c": 3}
+    assert table & {"a": None} == {"a": 1}
+    assert table - {"a": None} == {"b": 2}
+    assert table ^ {"a": None, "c": 3} == {"b": 2, "c": 3}
+
+    table |= {"b": 20}
+
+    assert table == {"a": 1, "b": 20}
+
+    with pytest.raises(TypeError):
+        table | ["a"]
+
+
+def test_should_not_rehash_keys_in_set_operators():
+    keys = [CountingKey(name) for name in "abcd"]
+    left = HashTable.from_pairs((key, key.name) for key in keys[:3])
+    right = HashTable.from_pairs((key, key.name) for key in keys[1:])
+
+    CountingKey.hash_calls = 0
+    union = left | right
+    difference = left ^ right
+
+    assert CountingKey.hash_calls == 0
+    assert len(union) == 4
+    assert difference.values == ["a", "d"]
+
+
+@pytest.mark.parametrize("table_class", ALL_TABLE_CLASSES)
+def test_should_merge_with_conflict_resolution(table_class):
+    table = table_class.from_dict({1: 1.0, 2: 2.0})
+
+    table.merge({2: 20.0, 3: 30.0}, lambda key, current, incoming: current + incoming)
+
+    assert table == {1: 1.0, 2: 22.0, 3: 30.0}
+
+    table.merge(table_class.from_dict({1: 10.0}))
+
+    assert table[1] == 10.0
+
+
+def test_should_compare_unhashable_values():
+    table = HashTable.from_dict({"a": [1], "b": {"c": 2}})
+
+    assert table == {"a": [1], "b": {"c": 2}}
+    assert table == HashTable.from_dict({"b": {"c": 2}, "a": [1]})
+    assert table != {"a": [1], "b": {"c": 3}}
+    assert table != {"a": [1]}
+    assert table != {"a": [1], "c": {"c": 2}}
+
+
+def test_should_compare_across_table_classes():
+    assert IntHashTable.from_dict({1: 1.0}) == HashTable.from_dict({1: 1.0})
+    assert HashTable.from_dict({1: 1.0}) == IntHashTable.from_dict({1: 1.0})
+    assert HashTable.from_dict({"a": 1.0}) != IntHashTable.from_dict({1: 1.0})
@@ -0,0 +1,145 @@
+"""Unit tests for persistent_hashtable"""
+
+import pytest
+
+from persistent_hashtable import PersistentHashTable
+
+
+@pytest.fixture
+def table(tmp_path):
+    sample = PersistentHashTable.create(tmp_path / "table.bin", capacity=8)
+    sample["hola"] = "hello"
+    sample[b"year"] = b"2022"
+
+    yield sample
+
+    sample.close()
+
+
+def test_should_store_bytes(table: PersistentHashTable):
+    assert len(table) == 2
+    assert table["hola"] == b"hello"
+    assert table[b"hola"] == b"hello"
+    assert table["year"] == b"2022"
+    assert "year" in table
+    assert "missing" not in table
+    assert table.get("missing") is None
+
+    with pytest.raises(KeyError):
+        table["missing"]
+
+
+def test_should_reject_other_types(table: PersistentHashTable):
+    with pytest.raises(TypeError):
+        table[42] = "value"
+
+
+def test_should_update_and_delete(table: PersistentHashTable):
+    table["hola"] = "hallo"
+    del table["year"]
+
+    assert table["hola"] == b"hallo"
+    assert "year" not in table
+    assert len(table) == 1
+
+    with pytest.raises(KeyError):
+        del table["year"]
+
+
+def test_should_persist_after_reopening(table: PersistentHashTable):
+    table.update({f"key{i}": f"value{i}" for i in range(100)})
+    table.close()
+
+    with PersistentHashTable(table.path) as reopened:
+        assert len(reopened) == 102
+        assert reopened["key42"] == b"value42"
+        assert sorted(reopened.keys)[:2] == [b"hola", b"key0"]
+
+
+def test_should_grow_past_capacity(table: PersistentHashTable):
+    for i in range(1000):
+        table[f"key{i}"] = "x" * i
+
+    assert table.capacity >= 1024 / 0.66
+    assert len(table) == 1002
+    assert all(table[f"key{i}"] == b"x" * i for i in range(1000))
+
+
+def test_should_compact_stale_records(table: PersistentHashTable, tmp_path):
+    for i in range(50):
+        table["hola"] = str(i) * 100
+
+    table.compact()
+
+    assert (tmp_path / "table.bin").stat().st_size < 50 * 200
+    assert table["hola"] == b"49" * 100
+    assert len(table) == 2
+
+
+def test_should_compact_when_stale_records_outweigh_live_ones(
+    table: PersistentHashTable, tmp_path
+):
+    for i in range(10_000):
+        table["hola"] = f"{i:0100}"
+
+    assert (tmp_path / "table.bin").stat().st_size < 10 * 1024
+
+    for i in range(1000):
+        table[f"key{i}"] = "value"
+        del table[f"key{i}"]
+
+    assert (tmp_path / "table.bin").stat().st_size < 10 * 1024
+    assert table["hola"] == f"{9999:0100}".encode()
+    assert len(table) == 2
+
+
+def test_should_follow_compactions_in_readers(tmp_path):
+    table = PersistentHashTable.create(tmp_path / "shared.bin", capacity=8)
+    reader = PersistentHashTable(table.path)
+
+    for i in range(50):
+        table[str(i)] = str(i)
+
+    assert reader["49"] == b"49"
+    assert len(reader) == 50
+    assert reader.capacity == table.capacity
+
+    for i in range(1000):
+        table["0"] = str(i)
+
+    assert reader["0"] == b"999"
+    reader.close()
+    table.close()
+
+
+def test_should_share_writes_with_readers(tmp_path):
+    table = PersistentHashTable.create(tmp_path / "shared.bin", capacity=1024)
+    reader = PersistentHashTable(table.path)
+
+    for i in range(200):
+        table[f"key{i}"] = "value" * 200
+
+    # the first read after the file has grown is a scan, not a lookup
+    assert dict(reader.iteritems()) == {
+        f"key{i}".encode(): b"value" * 200 for i in range(200)
+    }
+    assert reader["key199"] == b"value" * 200
+
+    with pytest.raises(PermissionError):
+        reader["key"] = "value"
+
+    table.compact(4096)
+    reader.reload()
+
+    assert reader.capacity == 4096
+    assert len(reader) == 200
+    reader.close()
+    table.close()
+
+
+def test_should_reject_foreign_files(tmp_path):
+    path = tmp_path / "foreign.bin"
+    path.write_bytes(b"\0" * 128)
+
+    with pytest.raises(ValueError):
+        PersistentHashTable(path)
@@ -0,0 +1,180 @@
+"""Unit tests for shared_hashtable"""
+
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from shared_hashtable import SharedHashTable
+
+
+@pytest.fixture
+def table():
+    sample = SharedHashTable(capacity=64, shards=4)
+    sample[1] = 0.5
+    sample[-2] = 37.0
+
+    yield sample
+
+    sample.close()
+    sample.unlink()
+
+
+def _lookup(table: SharedHashTable, keys: range) -> list:
+    return table.get_many(keys)
+
+
+def test_should_behave_like_a_hashtable(table):
+    table[1] = 1.5
+    table[3] = 3.0
+    del table[-2]
+
+    assert len(table) == 2
+    assert table[1] == 1.5
+    assert table.get(-2, "missing") == "missing"
+    assert 3 in table
+    assert sorted(table.keys) == [1, 3]
+
+    with pytest.raises(KeyError):
+        table[-2]
+
+    with pytest.raises(KeyError):
+        del table[-2]
+
+
+def test_should_spread_keys_over_shards():
+    with SharedHashTable.from_dict({i: i for i in range(1000)}) as table:
+        sizes = [shard.counts[0] for shard in table._shards]
+
+        assert sum(sizes) == len(table) == 1000
+        assert min(sizes) > 50
+        assert all(table[i] == i for i in range(1000))
+
+    table.unlink()
+
+
+def test_should_store_integer_values():
+    with SharedHashTable(shards=2, value_type="q") as table:
+        table.update({2**40: 2**50})
+
+        assert table[2**40] == 2**50
+
+        with pytest.raises(TypeError):
+            table[1] = 1.5
+
+        assert 1 not in table
+
+    table.unlink()
+
+
+@pytest.mark.parametrize("key", ("a", 1.5, None, 2**63, -(2**63) - 1))
+def test_should_not_find_keys_that_are_not_int64(table, key):
+    assert key not in table
+    assert table.get(key, "missing") == "missing"
+
+    with pytest.raises(KeyError):
+        table[key]
+
+    with pytest.raises(KeyError):
+        del table[key]
+
+
+def test_should_reject_keys_that_are_not_int64(table):
+    with pytest.raises(TypeError):
+        table["a"] = 1.0
+
+    with pytest.raises(TypeError):
+        table[1.5] = 1.0
+
+    with pytest.raises(OverflowError):
+        table[2**70] = 1.0
+
+    # the limits of the range still fit
+    table[2**63 - 1] = 1.0
+    table[-(2**63)] = 2.0
+
+    assert table[2**63 - 1] == 1.0
+    assert table[-(2**63)] == 2.0
+    assert len(table) == 4
+
+
+def test_should_reuse_deleted_slots(table):
+    for _ in range(10):
+        for i in range(100, 150):
+            table[i] = i
+        for i in range(100, 150):
+            del table[i]
+
+    assert len(table) == 2
+    assert table[1] == 0.5
+
+
+def test_should_raise_when_shard_is_full():
+    with SharedHashTable(capacity=2, shards=1) as table:
+        # one slot always stays empty
+        for i in range(table.capacity - 1):
+            table[i] = i
+
+        with pytest.raises(MemoryError):
+            table[table.capacity] = 0
+
+    table.unlink()
+
+
+@pytest.mark.parametrize("capacity", (1, 3, 7, 10, 100, 1000))
+@pytest.mark.parametrize("shards", (1, 8))
+def test_should_hold_the_capacity_it_was_created_with(capacity, shards):
+    generator = random.Random(capacity)
+
+    for _ in range(20):
+        keys = generator.sample(range(-(2**31), 2**31), capacity)
+
+        with SharedHashTable(capacity, shards) as table:
+            for key in keys:
+                table[key] = 1.0
+
+            assert len(table) == capacity
+
+        table.unlink()
+
+
+@pytest.mark.parametrize("size", (3, 10))
+def test_should_create_from_small_dict(size):
+    with SharedHashTable.from_dict({i: float(i) for i in range(size)}) as table:
+        assert all(table[i] == i for i in range(size))
+
+    table.unlink()
+
+
+def test_should_attach_when_unpickled(table):
+    other = pickle.loads(pickle.dumps(table))
+    other[5] = 5.0
+
+    assert len(pickle.dumps(table)) < 200
+    assert table[5] == 5.0
+    assert other.name == table.name
+    other.close()
+
+
+def test_should_reject_invalid_settings():
+    with pytest.raises(ValueError):
+        SharedHashTable(capacity=0)
+
+    with pytest.raises(ValueError):
+        SharedHashTable(shards=3)
+
+    with pytest.raises(ValueError):
+        SharedHashTable(value_type="u")
+
+
+def test_should_look_up_from_worker_processes():
+    with SharedHashTable.from_dict({i: i / 2 for i in range(1000)}) as table:
+        chunks = [range(start, start + 250) for start in range(0, 1000, 250)]
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(_lookup, [table] * len(chunks), chunks))
+
+        assert sum(results, []) == [i / 2 for i in range(1000)]
+
+    table.unlink()
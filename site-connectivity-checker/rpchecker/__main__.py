@@ -2,88 +2,310 @@ import asyncio
 import pathlib
 import sys
 from argparse import Namespace
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import partial
+from itertools import chain
 from time import perf_counter
-from typing import List
+from typing import Callable, Deque, Iterable, Iterator, Optional, Set
 
-from .checker import async_site_is_online, site_is_online
+from .checker import (
+    PROBES_PER_CHECK,
+    AsyncSiteChecker,
+    CheckResult,
+    normalize_host,
+    site_is_online,
+)
 from .cli import display_check_result, read_user_cli_args
+from .scheduler import monitor, run_checks
 
 
-def _get_websites_urls(user_args: Namespace) -> List[str]:
-    """_summary_
+def _get_websites_urls(user_args: Namespace) -> Iterator[str]:
+    """Lazily yield the hosts to check, each one only once.
+
+    Hosts from the command line come first, then those of the input file
+    as its lines are read. Only the set of distinct hosts seen so far is
+    kept in memory.
 
     Args:
-        user_args (Namespace): _description_
+        user_args (Namespace): the parsed command-line arguments
 
     Returns:
-        List[str]: _description_
+        Iterator[str]: normalized hosts, without duplicates
     """
-    urls: List[str] = user_args.urls
+    urls: Iterable[str] = user_args.urls
 
     if file := user_args.input_file:
-        urls.extend(_read_urls_from_file(file))
+        urls = chain(urls, _read_urls_from_file(file))
+
+    seen: Set[str] = set()
 
-    return urls
+    for url in urls:
+        host = normalize_host(url)
 
+        if host and host not in seen:
+            seen.add(host)
+            yield host
 
-def _read_urls_from_file(file: str) -> List[str]:
-    """_summary_
+
+def _read_urls_from_file(file: str) -> Iterator[str]:
+    """Yield the non-blank lines of a file, or of stdin when `file` is "-".
 
     Args:
-        file (str): _description_
+        file (str): path of the file containing URLs, one per line
 
     Returns:
-        List[str]: _description_
+        Iterator[str]: stripped lines, read one at a time
     """
+    if file == "-":
+        yield from filter(None, map(str.strip, sys.stdin))
+        return
+
     file_path = pathlib.Path(file)
 
     if not file_path.is_file():
         print("Input file not found/not a file", file=sys.stderr)
-        return []
+        return
 
     try:
         with file_path.open("r", encoding="utf-8") as f:
-            urls = list(map(lambda line: line.strip(), f))
+            yield from filter(None, map(str.strip, f))
     except Exception as e:
         print(str(e), file=sys.stderr)
-        return []
 
-    return urls
 
+def _timed_check(url: str, level: str = "http") -> CheckResult:
+    """Check a single site, catching its error and timing the check.
 
-def _synchronous_check(urls: List[str]) -> None:
-    """_summary_
+    Args:
+        url (str): the site to check
+        level (str, optional): how thoroughly to check it. Defaults to "http".
+
+    Returns:
+        CheckResult: the URL, the result, the error message and the time
+        taken when the site is online
+    """
+    a = perf_counter()
+    try:
+        result = site_is_online(url=url, level=level)
+    except Exception as e:
+        return url, False, str(e), None
+
+    return url, result, "", perf_counter() - a
+
+
+def _synchronous_check(
+    urls: Iterable[str], workers: int = 1, ordered: bool = True, level: str = "http"
+) -> None:
+    """Check sites with blocking connections, in a pool of threads if asked.
 
     Args:
-        urls (List[str]): _description_
+        urls (Iterable[str]): the sites to check, consumed lazily
+        workers (int, optional): number of threads. Defaults to 1.
+        ordered (bool, optional): display results in the order of `urls`
+            rather than as they complete. Defaults to True.
+        level (str, optional): how thoroughly to check each site. Defaults
+            to "http".
     """
-    for url in urls:
-        a = perf_counter()
-        try:
-            result = site_is_online(url=url)
-        except Exception as e:
-            display_check_result(result=False, url=url, error=str(e))
-        else:
-            display_check_result(result=result, url=url, time=perf_counter() - a)
+    check = partial(_timed_check, level=level)
 
+    if workers <= 1:
+        _display_results(map(check, urls))
+        return
 
-async def _asynchronous_check(urls: List[str]) -> None:
-    """_summary_
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        _display_results(_bounded_map(executor, check, urls, 2 * workers, ordered))
+
+
+def _bounded_map(
+    executor: Executor,
+    function: Callable[[str], CheckResult],
+    urls: Iterable[str],
+    window: int,
+    ordered: bool,
+) -> Iterator[CheckResult]:
+    """Map a function over URLs in an executor, with few pending at a time.
+
+    Unlike `Executor.map`, the URLs are submitted as they are consumed, at
+    most `window` ahead of the results. They are pulled from `urls` in a
+    thread of their own, so results are yielded as soon as they are ready,
+    even while a slow source such as stdin has no new URL yet.
 
     Args:
-        urls (List[str]): _description_
+        executor (Executor): runs the calls
+        function (Callable[[str], CheckResult]): the function to map
+        urls (Iterable[str]): the arguments, consumed lazily
+        window (int): maximum number of pending calls
+        ordered (bool): yield results in the order of `urls`
+
+    Returns:
+        Iterator[CheckResult]: the results
     """
+    pending: Deque[Future] = deque()
+    source = iter(urls)
+    # a reader blocked on stdin must not hold up the exit, hence no `with`
+    reader = ThreadPoolExecutor(max_workers=1)
+    next_url: Optional[Future] = reader.submit(next, source, None)
 
-    async def _wrapper(url: str) -> None:
-        a = perf_counter()
-        try:
-            result = await async_site_is_online(url=url)
-        except Exception as e:
-            display_check_result(result=False, url=url, error=str(e))
-        else:
-            display_check_result(result=result, url=url, time=perf_counter() - a)
+    try:
+        while next_url is not None or pending:
+            if ordered:
+                while pending and pending[0].done():
+                    yield pending.popleft().result()
+            else:
+                for _ in range(len(pending)):
+                    future = pending.popleft()
+                    if future.done():
+                        yield future.result()
+                    else:
+                        pending.append(future)
+
+            reading = next_url is not None and len(pending) < window
 
-    await asyncio.gather(*(_wrapper(url) for url in urls))
+            if reading and next_url.done():  # type: ignore
+                url = next_url.result()  # type: ignore
+                if url is None:
+                    next_url = None
+                else:
+                    pending.append(executor.submit(function, url))
+                    next_url = reader.submit(next, source, None)
+                continue
+
+            # in order, only the oldest call can let a result out
+            waiting = list(pending)[:1] if ordered else list(pending)
+            if reading:
+                waiting.append(next_url)
+            wait(waiting, return_when=FIRST_COMPLETED)
+    finally:
+        reader.shutdown(wait=False)
+
+
+def _display_results(results: Iterable[CheckResult]) -> None:
+    """Display check results as they become available.
+
+    Args:
+        results (Iterable[CheckResult]): results of `_timed_check`
+    """
+    for result in results:
+        _display_result(result)
+
+
+def _display_result(check_result: CheckResult) -> None:
+    """Display the result of a check.
+
+    Args:
+        check_result (CheckResult): the result of `_timed_check` or
+            `_timed_async_check`
+    """
+    url, result, error, time = check_result
+    display_check_result(result=result, url=url, error=error, time=time)
+
+
+async def _asynchronous_check(
+    urls: Iterable[str],
+    concurrency: int = 100,
+    rate_per_host: Optional[float] = None,
+    level: str = "http",
+) -> None:
+    """Check sites over one shared session, a bounded number at a time.
+
+    Args:
+        urls (Iterable[str]): the sites to check
+        concurrency (int, optional): number of checks running at once.
+            Defaults to 100.
+        rate_per_host (Optional[float], optional): checks allowed per second
+            for each host. Defaults to None, meaning no limit.
+        level (str, optional): how thoroughly to check each site. Defaults
+            to "http".
+    """
+    # waiting for a pooled connection counts towards a request's timeout,
+    # so every probe gets one rather than live sites queue behind dead ones
+    async with AsyncSiteChecker(
+        limit=PROBES_PER_CHECK * concurrency, level=level
+    ) as checker:
+        await run_checks(
+            urls, partial(_display_async_check, checker), concurrency, rate_per_host
+        )
+
+
+async def _monitor(
+    urls: Iterable[str],
+    interval: float = 60,
+    report_interval: Optional[float] = None,
+    concurrency: int = 100,
+    rate_per_host: Optional[float] = None,
+    level: str = "http",
+) -> None:
+    """Check sites over and over through one long-lived session.
+
+    Idle connections are kept open a little longer than the interval, so
+    every round reuses the connections and DNS cache of the previous one.
+
+    Args:
+        urls (Iterable[str]): the sites to monitor
+        interval (float, optional): base seconds between checks of a site.
+            Defaults to 60.
+        report_interval (Optional[float], optional): fewest seconds between
+            reports of a flapping site. Defaults to None, meaning ten times
+            `interval`.
+        concurrency (int, optional): number of checks running at once.
+            Defaults to 100.
+        rate_per_host (Optional[float], optional): checks allowed per second
+            for each host. Defaults to None, meaning no limit.
+        level (str, optional): how thoroughly to check each site. Defaults
+            to "http".
+    """
+    async with AsyncSiteChecker(
+        limit=PROBES_PER_CHECK * concurrency,
+        keepalive_timeout=max(15, 1.5 * interval),
+        level=level,
+    ) as checker:
+        await monitor(
+            urls,
+            partial(_timed_async_check, checker),
+            _display_result,
+            interval,
+            report_interval,
+            concurrency=concurrency,
+            rate_per_host=rate_per_host,
+        )
+
+
+async def _timed_async_check(checker: AsyncSiteChecker, url: str) -> CheckResult:
+    """Check a single site asynchronously, catching its error and timing
+    the check.
+
+    Args:
+        checker (AsyncSiteChecker): the checker holding the shared session
+        url (str): the site to check
+
+    Returns:
+        CheckResult: the URL, the result, the error message and the time
+        taken when the site is online
+    """
+    a = perf_counter()
+    try:
+        result = await checker.is_online(url=url)
+    except Exception as e:
+        return url, False, str(e), None
+
+    return url, result, "", perf_counter() - a
+
+
+async def _display_async_check(checker: AsyncSiteChecker, url: str) -> None:
+    """Check a single site asynchronously and display the result.
+
+    Args:
+        checker (AsyncSiteChecker): the checker holding the shared session
+        url (str): the site to check
+    """
+    _display_result(await _timed_async_check(checker, url))
 
 
 def main() -> None:
@@ -92,14 +314,36 @@ def main() -> None:
     user_args = read_user_cli_args()
     urls = _get_websites_urls(user_args)
 
-    if not urls:
+    if (first_url := next(urls, None)) is None:
         print("Error: no URLs provided", file=sys.stderr)
         sys.exit(1)
 
-    if not user_args.asynchronous:
-        _synchronous_check(urls)
+    urls = chain([first_url], urls)
+
+    if user_args.monitor:
+        try:
+            asyncio.run(
+                _monitor(
+                    urls,
+                    user_args.interval,
+                    user_args.report_interval,
+                    user_args.concurrency,
+                    user_args.rate_per_host,
+                    user_args.level,
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+    elif not user_args.asynchronous:
+        _synchronous_check(
+            urls, user_args.workers, not user_args.as_completed, user_args.level
+        )
     else:
-        asyncio.run(_asynchronous_check(urls))
+        asyncio.run(
+            _asynchronous_check(
+                urls, user_args.concurrency, user_args.rate_per_host, user_args.level
+            )
+        )
 
     print(f"Time elapsed: {perf_counter() - a} seconds")
 
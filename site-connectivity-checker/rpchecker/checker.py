@@ -1,16 +1,88 @@
 import asyncio
+import socket
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from http.client import HTTPConnection
-from urllib.parse import urlparse
+from typing import Awaitable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse, urlsplit
 
 import aiohttp
 
+# url, result, error message, time taken when online
+CheckResult = Tuple[str, bool, str, Optional[float]]
 
-def site_is_online(url: str, timeout: int = 2) -> bool:
+# how thoroughly a site is checked, from cheapest to most complete
+LEVELS = ("dns", "tcp", "http")
+
+# a check probes https and http, or ports 443 and 80, at once
+PROBES_PER_CHECK = 2
+
+# seconds between connection attempts to the next address of a host, as in
+# the Happy Eyeballs algorithm of RFC 8305
+HAPPY_EYEBALLS_DELAY = 0.25
+
+# forget expired resolutions once this many hosts are cached
+_MAX_CACHED_HOSTS = 10_000
+
+
+def get_host(url: str) -> str:
+    """Extract the host, and port if any, from a URL or a bare host name.
+
+    Args:
+        url (str): the URL, with or without a scheme
+
+    Returns:
+        str: the host part of the URL
+    """
+    # without a scheme, "example.com:8080" would parse as scheme and path
+    if "://" not in url:
+        url = f"//{url}"
+
+    return urlparse(url=url).netloc
+
+
+def normalize_host(url: str) -> str:
+    """Reduce a URL to its host, so that variants of a site compare equal.
+
+    Args:
+        url (str): the URL, with or without a scheme
+
+    Returns:
+        str: the lowercase host, without credentials or a trailing dot
+    """
+    host = get_host(url.strip()).rpartition("@")[2].lower()
+
+    if host.startswith("["):
+        return host
+
+    name, colon, port = host.partition(":")
+
+    return name.rstrip(".") + colon + port
+
+
+def split_host(host: str) -> Tuple[str, Optional[int]]:
+    """Split a host as returned by `get_host` into its name and port.
+
+    Args:
+        host (str): the host, with an optional port
+
+    Returns:
+        Tuple[str, Optional[int]]: the host name and the port, if any
+    """
+    parts = urlsplit(f"//{host}")
+
+    return parts.hostname or host, parts.port
+
+
+def site_is_online(url: str, timeout: int = 2, level: str = "http") -> bool:
     """_summary_
 
     Args:
         url (str): _description_
         timeout (int, optional): _description_. Defaults to 2.
+        level (str, optional): one of `LEVELS`: resolve the host only,
+            connect to it over TCP, or send an HTTP request. Defaults to
+            "http".
 
     Raises:
         error: _description_
@@ -18,62 +90,360 @@ def site_is_online(url: str, timeout: int = 2) -> bool:
     Returns:
         bool: _description_
     """
-    is_online = False
-
     error = Exception("UNKNOWN ERROR")
 
-    parser = urlparse(url=url)
+    name, port = split_host(get_host(url))
 
-    host = parser.netloc or parser.path.split("/")[0]
+    if level == "dns":
+        probe, ports = _resolve, (port or 80,)
+    else:
+        probe = _head_request if level == "http" else _tcp_connect
+        ports = (port,) if port else (80, 443)
 
-    for port in (80, 443):
-        connection = HTTPConnection(host=host, port=port, timeout=timeout)
+    # probe both ports at once and answer as soon as one succeeds; the other
+    # probe is left to finish in the background
+    executor = ThreadPoolExecutor(max_workers=len(ports))
+    futures = [executor.submit(probe, name, port, timeout) for port in ports]
 
-        try:
-            connection.request(method="HEAD", url="/")
-        except Exception as e:
-            error = e
-        else:
-            is_online = True
-        finally:
-            connection.close()
+    try:
+        # getaddrinfo has no timeout of its own, so stop waiting for it instead
+        for future in as_completed(
+            futures, timeout=timeout if level == "dns" else None
+        ):
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+    except FuturesTimeoutError:
+        error = Exception("Timed out!")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    if is_online:
-        return is_online
     raise error
 
 
-async def async_site_is_online(url: str, timeout: int = 2) -> bool:
-    """_summary_
+def _head_request(host: str, port: int, timeout: float) -> bool:
+    """Send a HEAD request to the root of a host.
 
     Args:
-        url (str): _description_
-        timeout (int, optional): _description_. Defaults to 2.
+        host (str): the host to connect to
+        port (int): the port to connect to
+        timeout (float): seconds allowed to connect and send the request
 
     Returns:
-        bool: _description_
+        bool: True once the request was sent
     """
-    is_online = False
+    connection = HTTPConnection(host=host, port=port, timeout=timeout)
 
-    error = Exception("UNKNOWN ERROR")
+    try:
+        connection.request(method="HEAD", url="/")
+    finally:
+        connection.close()
+
+    return True
+
+
+def _resolve(host: str, port: int, timeout: float) -> bool:
+    """Resolve a host name.
+
+    Args:
+        host (str): the host name
+        port (int): the port to resolve the addresses for
+        timeout (float): unused, as lookups cannot time out by themselves
+
+    Returns:
+        bool: True once the host resolved
+    """
+    socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+
+    return True
+
+
+def _tcp_connect(host: str, port: int, timeout: float) -> bool:
+    """Open and close a TCP connection to a host.
+
+    Args:
+        host (str): the host to connect to
+        port (int): the port to connect to
+        timeout (float): seconds allowed to connect
+
+    Returns:
+        bool: True once connected
+    """
+    socket.create_connection((host, port), timeout=timeout).close()
+
+    return True
+
+
+class ResolverCache:
+    """Resolve host names without blocking, caching the addresses.
+
+    Concurrent lookups of the same host share a single resolution, and
+    failed lookups are not cached, so they are retried on the next check.
+    """
+
+    def __init__(self, ttl: float = 300) -> None:
+        """Set how long resolutions are kept.
+
+        Args:
+            ttl (float, optional): seconds to cache addresses. Defaults to 300.
+        """
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, "asyncio.Future[List[str]]"]] = {}
 
-    parser = urlparse(url=url)
+    async def resolve(self, host: str) -> List[str]:
+        """Return the addresses of a host, from the cache when possible.
 
-    host = parser.netloc or parser.path.split("/")[0]
+        Args:
+            host (str): the host name
 
-    for scheme in ("https", "http"):
-        target = f"{scheme}://{host}"
+        Returns:
+            List[str]: its IP addresses
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        entry = self._entries.get(host)
 
-        async with aiohttp.ClientSession() as session:
+        if entry is None or entry[0] <= now:
+            if len(self._entries) > _MAX_CACHED_HOSTS:
+                self._entries = {
+                    name: cached
+                    for name, cached in self._entries.items()
+                    if cached[0] > now
+                }
+
+            lookup = asyncio.ensure_future(self._lookup(host))
+            # nobody may be waiting anymore when a lookup fails
+            lookup.add_done_callback(lambda done: done.cancelled() or done.exception())
+            entry = self._entries[host] = (now + self.ttl, lookup)
+
+        try:
+            # a cancelled check must not cancel a lookup others wait for
+            return await asyncio.shield(entry[1])
+        except Exception:
+            if self._entries.get(host) is entry:
+                del self._entries[host]
+            raise
+
+    @staticmethod
+    async def _lookup(host: str) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, None, type=socket.SOCK_STREAM
+        )
+
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+async def _first_success(probes: Iterable[Awaitable[bool]]) -> bool:
+    """Run probes at once and return when the first succeeds, cancelling
+    the others.
+
+    Args:
+        probes (Iterable[Awaitable[bool]]): the probes to run
+
+    Raises:
+        error: the last error when every probe failed
+
+    Returns:
+        bool: the result of the first successful probe
+    """
+    error = Exception("UNKNOWN ERROR")
+
+    tasks = [asyncio.ensure_future(probe) for probe in probes]
+
+    try:
+        for task in asyncio.as_completed(tasks):
             try:
-                await session.head(url=target, timeout=timeout)
+                return await task
             except asyncio.exceptions.TimeoutError:
                 error = Exception("Timed out!")
             except Exception as e:
                 error = e
-            else:
-                is_online = True
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    if is_online:
-        return is_online
     raise error
+
+
+class AsyncSiteChecker:
+    """Check sites over one aiohttp session shared by every check.
+
+    The session's connector keeps connections alive and caches DNS lookups,
+    so checking many URLs reuses sockets, resolutions and TLS state instead
+    of setting them up again for each one. Use it as an async context
+    manager, which opens the session and closes it when leaving.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 2,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        ttl_dns_cache: int = 300,
+        keepalive_timeout: float = 15,
+        level: str = "http",
+    ) -> None:
+        """Configure the session's timeout and connection pool.
+
+        Args:
+            timeout (float, optional): seconds allowed per request. Defaults to 2.
+            limit (int, optional): maximum number of open connections.
+                Defaults to 100.
+            limit_per_host (int, optional): maximum number of open connections
+                to the same host. Defaults to 8.
+            ttl_dns_cache (int, optional): seconds to cache DNS lookups.
+                Defaults to 300.
+            keepalive_timeout (float, optional): seconds to keep idle
+                connections open. Defaults to 15.
+            level (str, optional): one of `LEVELS`: resolve the host only,
+                connect to it over TCP, or send an HTTP request. Defaults
+                to "http".
+        """
+        if level not in LEVELS:
+            raise ValueError(f"unknown check level: {level!r}")
+
+        self.timeout = timeout
+        self.level = level
+        self.resolver = ResolverCache(ttl=ttl_dns_cache)
+        self._connector_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "ttl_dns_cache": ttl_dns_cache,
+            "keepalive_timeout": keepalive_timeout,
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncSiteChecker":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(**self._connector_options),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def is_online(self, url: str) -> bool:
+        """Check a site at the checker's level: resolve its host, connect to
+        it on ports 443 and 80, or request it over https and http, the first
+        success winning.
+
+        Args:
+            url (str): the site to check
+
+        Raises:
+            error: the last error when no probe succeeded
+
+        Returns:
+            bool: True when the site answered
+        """
+        if self._session is None:
+            raise RuntimeError("the checker should be used with 'async with'")
+
+        host = get_host(url)
+
+        if self.level == "http":
+            return await _first_success(
+                self._head(f"{scheme}://{host}") for scheme in ("https", "http")
+            )
+
+        name, port = split_host(host)
+
+        if self.level == "dns":
+            probes: Iterable[Awaitable[bool]] = [self._resolve(name)]
+        else:
+            ports = (port,) if port else (443, 80)
+            probes = [self._connect(name, port) for port in ports]
+
+        return await _first_success(probes)
+
+    async def _resolve(self, host: str) -> bool:
+        """Resolve a host through the shared resolver cache.
+
+        Args:
+            host (str): the host name
+
+        Returns:
+            bool: True once the host resolved
+        """
+        await asyncio.wait_for(self.resolver.resolve(host), self.timeout)
+
+        return True
+
+    async def _connect(self, host: str, port: int) -> bool:
+        """Open and close a TCP connection, resolving the host through the
+        shared resolver cache.
+
+        Every address of the host is tried, each one `HAPPY_EYEBALLS_DELAY`
+        after the previous, so an unreachable first address, such as IPv6
+        without a route, does not make the host look offline.
+
+        Args:
+            host (str): the host name
+            port (int): the port to connect to
+
+        Returns:
+            bool: True once connected
+        """
+
+        async def connect() -> bool:
+            addresses = await self.resolver.resolve(host)
+            return await _first_success(
+                self._connect_address(address, port, position * HAPPY_EYEBALLS_DELAY)
+                for position, address in enumerate(addresses)
+            )
+
+        return await asyncio.wait_for(connect(), self.timeout)
+
+    @staticmethod
+    async def _connect_address(address: str, port: int, delay: float) -> bool:
+        """Open and close a TCP connection to one address after a delay.
+
+        Args:
+            address (str): the IP address to connect to
+            port (int): the port to connect to
+            delay (float): seconds to wait first
+
+        Returns:
+            bool: True once connected
+        """
+        await asyncio.sleep(delay)
+        _, writer = await asyncio.open_connection(address, port)
+        writer.close()
+        await writer.wait_closed()
+
+        return True
+
+    async def _head(self, target: str) -> bool:
+        """Send a HEAD request through the shared session.
+
+        Args:
+            target (str): the URL to request
+
+        Returns:
+            bool: True once a response arrived
+        """
+        # leaving the block releases the connection back to the pool
+        async with self._session.head(url=target):  # type: ignore
+            pass
+
+        return True
+
+
+async def async_site_is_online(url: str, timeout: int = 2, level: str = "http") -> bool:
+    """_summary_
+
+    Args:
+        url (str): _description_
+        timeout (int, optional): _description_. Defaults to 2.
+        level (str, optional): one of `LEVELS`. Defaults to "http".
+
+    Returns:
+        bool: _description_
+    """
+    async with AsyncSiteChecker(timeout=timeout, level=level) as checker:
+        return await checker.is_online(url)
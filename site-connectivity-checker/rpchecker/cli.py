@@ -1,6 +1,54 @@
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
 from typing import Optional
 
+from .checker import LEVELS
+
+
+def _positive_int(value: str) -> int:
+    """Parse a command-line argument that must be a positive integer.
+
+    Args:
+        value (str): the argument as typed by the user
+
+    Raises:
+        ArgumentTypeError: when the value is not a positive integer
+
+    Returns:
+        int: the parsed value
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number <= 0:
+        raise ArgumentTypeError(f"expected a positive integer, got {value!r}")
+
+    return number
+
+
+def _positive_float(value: str) -> float:
+    """Parse a command-line argument that must be a positive number.
+
+    Args:
+        value (str): the argument as typed by the user
+
+    Raises:
+        ArgumentTypeError: when the value is not a positive number
+
+    Returns:
+        float: the parsed value
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0
+
+    if not number > 0:
+        raise ArgumentTypeError(f"expected a positive number, got {value!r}")
+
+    return number
+
 
 def read_user_cli_args() -> Namespace:
     """_summary_
@@ -28,7 +76,7 @@ def read_user_cli_args() -> Namespace:
         metavar="FILE",
         type=str,
         default="",
-        help="file containing URLs",
+        help='file containing URLs, or "-" to read them from stdin',
     )
 
     parser.add_argument(
@@ -38,6 +86,73 @@ def read_user_cli_args() -> Namespace:
         help="switch on async mode",
     )
 
+    parser.add_argument(
+        "-w",
+        "--workers",
+        metavar="N",
+        type=_positive_int,
+        default=1,
+        help="number of threads checking sites in sync mode",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        metavar="N",
+        type=_positive_int,
+        default=100,
+        help="number of checks running at once in async mode",
+    )
+
+    parser.add_argument(
+        "--rate-per-host",
+        metavar="RATE",
+        type=_positive_float,
+        default=None,
+        help="maximum checks per second of the same host, whatever the port, in"
+        " async mode; each site is checked once per run, so this mostly"
+        " matters with --monitor",
+    )
+
+    parser.add_argument(
+        "-l",
+        "--level",
+        choices=LEVELS,
+        default="http",
+        help="resolve the host only, connect to it over TCP, or send an HTTP"
+        " request (default: http)",
+    )
+
+    parser.add_argument(
+        "-m",
+        "--monitor",
+        action="store_true",
+        help="keep checking the sites asynchronously until interrupted",
+    )
+
+    parser.add_argument(
+        "--interval",
+        metavar="SECONDS",
+        type=_positive_float,
+        default=60,
+        help="seconds between checks of a site in monitor mode (default: 60)",
+    )
+
+    parser.add_argument(
+        "--report-interval",
+        metavar="SECONDS",
+        type=_positive_float,
+        default=None,
+        help="fewest seconds between reports of a flapping site in monitor mode"
+        " (default: ten times the interval)",
+    )
+
+    parser.add_argument(
+        "--as-completed",
+        action="store_true",
+        help="display results as checks finish instead of in input order",
+    )
+
     return parser.parse_args()
 
 
@@ -0,0 +1,256 @@
+import asyncio
+import random
+import sys
+from collections import deque
+from functools import partial
+from typing import Awaitable, Callable, Deque, Dict, Iterable, Optional
+
+from .checker import CheckResult, get_host, split_host
+
+# forget hosts whose next slot has passed once this many are tracked
+_MAX_TRACKED_HOSTS = 10_000
+
+# a target is flapping when its status changed in this share of its
+# last FLAP_WINDOW checks
+FLAP_WINDOW = 10
+FLAP_THRESHOLD = 0.3
+# share of the base interval between checks of a changing or flapping site
+UNSTABLE_INTERVAL_FACTOR = 0.5
+
+
+class HostRateLimiter:
+    """Space out checks of the same host to at most `rate` per second.
+
+    Hosts are told apart by name only, so the ports of one host share a
+    rate. Sites are deduplicated before a one-shot run, which leaves only
+    those ports to space out there; the limit mostly matters when
+    `monitor` checks the same hosts again and again.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """Set how often each host may be checked.
+
+        Args:
+            rate (float): checks allowed per second for each host
+        """
+        self.interval = 1 / rate
+        self._next_slot: Dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        """Sleep until the host can be checked again, then book the slot.
+
+        Args:
+            host (str): the host about to be checked
+        """
+        now = asyncio.get_running_loop().time()
+
+        if len(self._next_slot) > _MAX_TRACKED_HOSTS:
+            self._next_slot = {
+                name: slot for name, slot in self._next_slot.items() if slot > now
+            }
+
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _host_name(url: str) -> str:
+    return split_host(get_host(url))[0]
+
+
+async def run_checks(
+    urls: Iterable[str],
+    check: Callable[[str], Awaitable[object]],
+    concurrency: int = 100,
+    rate_per_host: Optional[float] = None,
+) -> None:
+    """Run `check` over URLs with a fixed number of worker tasks.
+
+    URLs are fed through a queue holding at most `concurrency` of them, so
+    no more than twice that many are in flight or waiting at any time,
+    however long `urls` is. They are pulled from `urls` in a thread, so a
+    slow source such as stdin does not hold up the running checks. Workers
+    waiting for a rate-limited host keep their slot until they can go ahead.
+
+    Args:
+        urls (Iterable[str]): the sites to check, consumed lazily
+        check (Callable[[str], Awaitable[object]]): checks one site and
+            reports its result
+        concurrency (int, optional): number of checks running at once.
+            Defaults to 100.
+        rate_per_host (Optional[float], optional): checks allowed per second
+            for each host. Defaults to None, meaning no limit.
+    """
+    queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=concurrency)
+    limiter = HostRateLimiter(rate_per_host) if rate_per_host else None
+
+    async def _worker() -> None:
+        while True:
+            url = await queue.get()
+            try:
+                if limiter is not None:
+                    await limiter.wait(_host_name(url))
+                await check(url)
+            except Exception as e:
+                print(f"Error checking {url}: {e}", file=sys.stderr)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(_worker()) for _ in range(concurrency)]
+
+    loop = asyncio.get_running_loop()
+    next_url = partial(loop.run_in_executor, None, next, iter(urls), None)
+
+    try:
+        while (url := await next_url()) is not None:
+            await queue.put(url)
+        await queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class MonitoredSite:
+    """The schedule of a site checked over and over by `monitor`.
+
+    A steady site is checked every base interval. After its status
+    changes, and for as long as it keeps flapping, it is checked twice as
+    often, to confirm outages quickly and to see when it settles down.
+    Only the output backs off: the results of a flapping site are
+    reported at most once per `report_interval`, except that its
+    first result is always reported.
+    """
+
+    def __init__(self, url: str, interval: float, report_interval: float) -> None:
+        """Start the schedule of a site at the base interval.
+
+        Args:
+            url (str): the site to check
+            interval (float): base seconds between checks
+            report_interval (float): fewest seconds between reports of a
+                flapping site
+        """
+        self.url = url
+        self.base_interval = interval
+        self.report_interval = report_interval
+        self.interval = interval
+        self.online: Optional[bool] = None
+        self.report_due = True
+        self._next_report = float("-inf")
+        self._changes: Deque[bool] = deque(maxlen=FLAP_WINDOW)
+
+    @property
+    def flapping(self) -> bool:
+        """Tell whether the site's status keeps changing."""
+        return sum(self._changes) >= FLAP_THRESHOLD * FLAP_WINDOW
+
+    def record(self, online: bool, now: float) -> float:
+        """Record the result of a check, adapt the interval to it and
+        decide whether the result should be reported.
+
+        Args:
+            online (bool): whether the site was online
+            now (float): the time of the check, in seconds
+
+        Returns:
+            float: seconds until the next check
+        """
+        changed = self.online is not None and online != self.online
+        if self.online is not None:
+            self._changes.append(changed)
+        self.online = online
+
+        self.report_due = not self.flapping or now >= self._next_report
+        if self.report_due:
+            self._next_report = now + self.report_interval
+
+        if changed or self.flapping:
+            self.interval = self.base_interval * UNSTABLE_INTERVAL_FACTOR
+        else:
+            self.interval = self.base_interval
+
+        return self.interval
+
+
+async def monitor(
+    urls: Iterable[str],
+    check: Callable[[str], Awaitable[CheckResult]],
+    report: Callable[[CheckResult], None],
+    interval: float = 60,
+    report_interval: Optional[float] = None,
+    jitter: float = 0.1,
+    concurrency: int = 100,
+    rate_per_host: Optional[float] = None,
+) -> None:
+    """Check sites over and over, each on its own schedule, until cancelled.
+
+    The first check of each site happens at a random point of the first
+    interval and every later delay is shifted by up to `jitter` of itself,
+    so sites read at once are not all checked at the same moment. URLs are
+    pulled from `urls` in a thread as they come, and a site starts being
+    monitored as soon as it is read. See `MonitoredSite` for how the
+    interval and the reports adapt to flapping sites.
+
+    Args:
+        urls (Iterable[str]): the sites to monitor
+        check (Callable[[str], Awaitable[CheckResult]]): checks one site
+        report (Callable[[CheckResult], None]): reports the result of a check
+        interval (float, optional): base seconds between checks of a site.
+            Defaults to 60.
+        report_interval (Optional[float], optional): fewest seconds between
+            reports of a flapping site. Defaults to None, meaning ten times
+            `interval`.
+        jitter (float, optional): share of each delay to shift at random.
+            Defaults to 0.1.
+        concurrency (int, optional): number of checks running at once.
+            Defaults to 100.
+        rate_per_host (Optional[float], optional): checks allowed per second
+            for each host. Defaults to None, meaning no limit.
+    """
+    if report_interval is None:
+        report_interval = 10 * interval
+
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(rate_per_host) if rate_per_host else None
+
+    async def _watch(site: MonitoredSite) -> None:
+        delay = random.uniform(0, interval)
+
+        while True:
+            await asyncio.sleep(delay)
+
+            # a bad URL, such as one with an invalid port, fails its check
+            # instead of stopping the monitor
+            try:
+                if limiter is not None:
+                    await limiter.wait(_host_name(site.url))
+
+                async with slots:
+                    result = await check(site.url)
+            except Exception as e:
+                result = (site.url, False, str(e), None)
+
+            delay = site.record(result[1], loop.time())
+            delay *= random.uniform(1 - jitter, 1 + jitter)
+
+            if site.report_due:
+                report(result)
+
+    watchers = []
+    next_url = partial(loop.run_in_executor, None, next, iter(urls), None)
+
+    try:
+        while (url := await next_url()) is not None:
+            site = MonitoredSite(url, interval, report_interval)
+            watchers.append(asyncio.create_task(_watch(site)))
+
+        # the sites are watched forever, until the monitor is cancelled
+        await asyncio.gather(*watchers)
+    finally:
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)